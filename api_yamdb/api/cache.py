@@ -0,0 +1,106 @@
+import hashlib
+import uuid
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction
+from reviews.models import Category, Genre
+
+RESPONSE_CACHE_TIMEOUT = getattr(settings, "RESPONSE_CACHE_TIMEOUT", 300)
+# Versions expire too, so caches of a process that missed an invalidation,
+# with a per-process backend or after writes without signals, are reloaded.
+VERSION_TIMEOUT = getattr(
+    settings, "CACHE_VERSION_TIMEOUT", RESPONSE_CACHE_TIMEOUT
+)
+
+
+def new_version():
+    return uuid.uuid4().hex
+
+
+def get_version(namespace):
+    """Current version of the cached responses of the namespace."""
+
+    return cache.get_or_set(
+        f"response_version:{namespace}", new_version, VERSION_TIMEOUT
+    )
+
+
+def invalidate(*namespaces):
+    """Drops all cached responses of the namespaces.
+    The version is replaced by a random one, so responses cached for an
+    evicted version key can never be served again."""
+
+    cache.set_many(
+        {f"response_version:{namespace}": new_version()
+         for namespace in namespaces},
+        VERSION_TIMEOUT,
+    )
+
+
+def invalidate_on_commit(*namespaces):
+    """Drops the cached responses of the namespaces once the current
+    transaction commits. Dropped earlier, a read arriving before the
+    commit would cache the old rows under the new version."""
+
+    transaction.on_commit(lambda: invalidate(*namespaces))
+
+
+def make_key(namespace, path):
+    digest = hashlib.md5(path.encode()).hexdigest()
+    return f"response:{namespace}:{get_version(namespace)}:{digest}"
+
+
+class SlugCache:
+    """Per-process map of the rows of a small model by slug and by pk.
+    Every process keeps its own copy and reloads it when the version
+    kept in the Django cache changes. A write in one worker reaches the
+    others right away only when CACHE_BACKEND is shared between them,
+    otherwise once the version expires after CACHE_VERSION_TIMEOUT."""
+
+    def __init__(self, model):
+        self.model = model
+        self.namespace = f"slugs:{model._meta.model_name}"
+        self.state = None
+
+    def __deepcopy__(self, memo):
+        # Serializer fields are deep-copied per serializer instance,
+        # they all have to share the one map of the process.
+        return self
+
+    def load(self, force=False):
+        state = self.state
+        version = get_version(self.namespace)
+        if not force and state is not None and state[0] == version:
+            return state
+        objects = list(self.model.objects.all())
+        self.state = (
+            version,
+            {obj.slug: obj for obj in objects},
+            {obj.pk: obj for obj in objects},
+        )
+        return self.state
+
+    def by_slug(self):
+        return self.load()[1]
+
+    def by_pk(self):
+        return self.load()[2]
+
+    def get(self, pk, objects=None):
+        """The object with the primary key, from a by_pk() map already
+        checked for this response when one is passed. A miss reloads
+        the map, the row may have been committed after it was loaded.
+        None when the row is still missing, deleted since it was read."""
+
+        obj = (self.by_pk() if objects is None else objects).get(pk)
+        if obj is not None:
+            return obj
+        return self.load(force=True)[2].get(pk)
+
+    def invalidate(self):
+        invalidate(self.namespace)
+
+
+GENRE_SLUGS = SlugCache(Genre)
+CATEGORY_SLUGS = SlugCache(Category)
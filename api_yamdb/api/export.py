@@ -0,0 +1,59 @@
+import csv
+import json
+
+from reviews.models import add_pending_scores
+from reviews.ratings import chunked
+
+from .serializers import title_rows
+
+EXPORT_CHUNK_SIZE = 2000
+CSV_HEADER = ("id", "name", "year", "rating", "reviews_count", "description",
+              "genre", "category")
+
+
+class Echo:
+    """File-like object returning what is written to it,
+    so csv.writer produces lines for a streaming response."""
+
+    def write(self, value):
+        return value
+
+
+def export_rows(values, chunk_size=EXPORT_CHUNK_SIZE):
+    """Titles of a values(*TITLE_VALUES) queryset read with a server-side
+    cursor, the genres being loaded once per chunk."""
+
+    rows = values.iterator(chunk_size=chunk_size)
+    for chunk in chunked(rows, chunk_size):
+        add_pending_scores(chunk)
+        yield from title_rows(chunk)
+
+
+def ndjson_lines(values):
+    for row in export_rows(values):
+        yield json.dumps(row, ensure_ascii=False) + "\n"
+
+
+def csv_lines(values):
+    """Genres are exported as comma-separated slugs
+    and the category as its slug."""
+
+    writer = csv.writer(Echo())
+    yield writer.writerow(CSV_HEADER)
+    for row in export_rows(values):
+        yield writer.writerow((
+            row["id"],
+            row["name"],
+            row["year"],
+            row["rating"],
+            row["reviews_count"],
+            row["description"],
+            ",".join(genre["slug"] for genre in row["genre"]),
+            row["category"] and row["category"]["slug"],
+        ))
+
+
+EXPORT_FORMATS = {
+    "ndjson": (ndjson_lines, "application/x-ndjson"),
+    "csv": (csv_lines, "text/csv"),
+}
@@ -1,18 +1,99 @@
+from django.db.models import Exists, F, OuterRef
 from django_filters import rest_framework as filters
+from rest_framework.filters import OrderingFilter
 from reviews.models import Title
 
+from .cache import CATEGORY_SLUGS, GENRE_SLUGS
+
+MATCH_CHOICES = (
+    ("any", "Any of the genres"),
+    ("all", "All of the genres"),
+)
+
+
+def split_slugs(value):
+    return {slug.strip() for slug in value.split(",") if slug.strip()}
+
+
+def slug_ids(slug_cache, slugs):
+    """Primary keys of the slugs that exist. Slugs missing from the cache
+    are looked up in the database with one query, they may have been
+    written without signals or by another process."""
+
+    objects = slug_cache.by_slug()
+    ids = [objects[slug].pk for slug in slugs if slug in objects]
+    missing = [slug for slug in slugs if slug not in objects]
+    if missing:
+        ids += slug_cache.model.objects.filter(slug__in=missing).values_list(
+            "pk", flat=True
+        )
+    return ids
+
 
 class TitlesFilter(filters.FilterSet):
-    """Filter for the viewset TitleViewSet."""
+    """Filter for the viewset TitleViewSet.
+    Genre and category take one or several comma-separated slugs,
+    resolved from the per-process slug caches."""
 
     name = filters.CharFilter(field_name="name", lookup_expr="icontains")
-    category = filters.CharFilter(
-        field_name="category__slug", lookup_expr="icontains"
-    )
-    genre = filters.CharFilter(
-        field_name="genre__slug", lookup_expr="icontains"
+    category = filters.CharFilter(method="filter_category")
+    genre = filters.CharFilter(method="filter_genre")
+    genre_match = filters.ChoiceFilter(
+        choices=MATCH_CHOICES, method="filter_genre_match"
     )
+    search = filters.CharFilter(method="filter_search")
 
     class Meta:
         model = Title
-        fields = ["name", "year", "genre", "category"]
+        fields = ["name", "year", "genre", "genre_match", "category", "search"]
+
+    def filter_category(self, queryset, name, value):
+        ids = slug_ids(CATEGORY_SLUGS, split_slugs(value))
+        return queryset.filter(category_id__in=ids)
+
+    def filter_genre(self, queryset, name, value):
+        """Titles having any of the genres, or all of them
+        with genre_match=all. Every title is returned once."""
+
+        slugs = split_slugs(value)
+        ids = slug_ids(GENRE_SLUGS, slugs)
+        if not ids:
+            return queryset.none()
+        title_genres = Title.genre.through.objects.filter(
+            title_id=OuterRef("pk")
+        )
+        if self.form.cleaned_data.get("genre_match") != "all":
+            return queryset.annotate(
+                has_genre=Exists(title_genres.filter(genre_id__in=ids))
+            ).filter(has_genre=True)
+        if len(ids) < len(slugs):
+            return queryset.none()
+        for genre_id in ids:
+            alias = f"has_genre_{genre_id}"
+            queryset = queryset.annotate(
+                **{alias: Exists(title_genres.filter(genre_id=genre_id))}
+            ).filter(**{alias: True})
+        return queryset
+
+    def filter_genre_match(self, queryset, name, value):
+        return queryset
+
+    def filter_search(self, queryset, name, value):
+        return queryset.search(value)
+
+
+class NullsLastOrderingFilter(OrderingFilter):
+    """OrderingFilter keeping objects without a value at the end,
+    in both directions. Without the ordering parameter the queryset
+    order is kept, the view ordering is only used by the paginator."""
+
+    def filter_queryset(self, request, queryset, view):
+        if self.ordering_param not in request.query_params:
+            return queryset
+        ordering = self.get_ordering(request, queryset, view)
+        expressions = [
+            F(field[1:]).desc(nulls_last=True) if field.startswith("-")
+            else F(field).asc(nulls_last=True)
+            for field in ordering
+        ]
+        return queryset.order_by(*expressions, "id")
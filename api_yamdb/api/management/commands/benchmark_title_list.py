@@ -0,0 +1,82 @@
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+from rest_framework.renderers import JSONRenderer
+from reviews.models import Category, Genre, Title
+
+from ...serializers import TITLE_VALUES, ReadOnlyTitleSerializer, title_rows
+from ...views import TitleViewSet
+
+
+class RollbackError(Exception):
+    pass
+
+
+class Command(BaseCommand):
+    help = (
+        "Compare the serializer and the values() paths of the title list "
+        "on a generated catalogue that is rolled back afterwards."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--titles", type=int, default=1000)
+        parser.add_argument("--page-size", type=int, default=100)
+        parser.add_argument("--repeat", type=int, default=20)
+
+    def handle(self, *args, **options):
+        try:
+            with transaction.atomic():
+                self.create_catalogue(options["titles"])
+                self.benchmark(options["page_size"], options["repeat"])
+                raise RollbackError
+        except RollbackError:
+            pass
+
+    def create_catalogue(self, count):
+        category = Category.objects.create(name="Benchmark", slug="bench")
+        genres = [
+            Genre.objects.create(
+                name=f"Benchmark {number}", slug=f"bench-{number}"
+            )
+            for number in range(3)
+        ]
+        for number in range(count):
+            title = Title.objects.create(
+                name=f"Benchmark title {number}",
+                year=2000,
+                description="Benchmark",
+                category=category,
+            )
+            title.genre.set(genres[:number % 3 + 1])
+
+    def benchmark(self, page_size, repeat):
+        queryset = TitleViewSet.queryset.filter(
+            category__slug="bench"
+        )[:page_size]
+        renderer = JSONRenderer()
+
+        def serializer_path():
+            return renderer.render(
+                ReadOnlyTitleSerializer(
+                    queryset.all(), many=True,
+                    context={"request": None},
+                ).data
+            )
+
+        def values_path():
+            return renderer.render(title_rows(
+                queryset.prefetch_related(None).values(*TITLE_VALUES)
+            ))
+
+        if serializer_path() != values_path():
+            raise CommandError("The two paths render different output.")
+        for name, path in (("serializer", serializer_path),
+                           ("values", values_path)):
+            started = time.perf_counter()
+            for _ in range(repeat):
+                path()
+            elapsed = time.perf_counter() - started
+            self.stdout.write(
+                f"{name}: {repeat * page_size / elapsed:.0f} titles/s"
+            )
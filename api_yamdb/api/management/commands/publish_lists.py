@@ -0,0 +1,19 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from ...publish import PUBLISHED_LISTS, publish, published_root, published_url
+
+
+class Command(BaseCommand):
+    help = (
+        "Write the genre and category list pages served by nginx "
+        "into PUBLISHED_LISTS_ROOT."
+    )
+
+    def handle(self, *args, **options):
+        if not published_root():
+            raise CommandError("PUBLISHED_LISTS_ROOT is not set.")
+        if not published_url():
+            raise CommandError("PUBLISHED_LISTS_URL is not set.")
+        for namespace in PUBLISHED_LISTS:
+            publish(namespace)
+            self.stdout.write(f"Published the {namespace} list")
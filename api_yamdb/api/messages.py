@@ -9,4 +9,11 @@ MESSAGES = {
     "username_or_code_invalid": "Invalid username or code",
     "duplication_review": "You have already written a review for this title",
     "no_valid_year": "Unable to specify a year in the future",
+    "top_one_scope": "Filter the top by either genre or category",
+    "export_format": "Export format must be one of: {}",
+    "bulk_too_many": "No more than {} titles can be created at once",
+    "cursor_search": "Search results are ranked, they are paginated "
+                     "by page number only",
+    "cursor_ordering": "Results sorted with the ordering parameter "
+                       "are paginated by page number only",
 }
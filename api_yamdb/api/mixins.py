@@ -1,4 +1,14 @@
-from rest_framework import mixins, viewsets
+import calendar
+
+from django.core.cache import cache
+from django.http import Http404
+from django.utils.cache import get_conditional_response
+from django.utils.http import http_date
+from rest_framework import mixins, status, viewsets
+from rest_framework.response import Response
+
+from .cache import RESPONSE_CACHE_TIMEOUT, make_key
+from .serializers import requested_fields
 
 
 class ListCreateDestroyViewSet(
@@ -8,3 +18,155 @@ class ListCreateDestroyViewSet(
     viewsets.GenericViewSet,
 ):
     pass
+
+
+class NestedParentMixin:
+    """Nested routes filter on their parent chain in the list query itself.
+    The parent is looked up separately only when the page is empty,
+    to tell an empty list from a missing parent.
+    Views provide the filter with parent_lookups and the check
+    with parent_exists."""
+
+    parent_lookups = {}
+
+    def get_parent_filter(self):
+        return {
+            lookup: self.kwargs.get(kwarg)
+            for kwarg, lookup in self.parent_lookups.items()
+        }
+
+    def parent_exists(self):
+        raise NotImplementedError
+
+    def check_parent(self):
+        if not self.parent_exists():
+            raise Http404
+
+    def paginate_queryset(self, queryset):
+        page = super().paginate_queryset(queryset)
+        if not page:
+            self.check_parent()
+        return page
+
+
+class AnonymousCacheMixin:
+    """Caches list responses for anonymous users.
+    Responses are keyed on the path with query parameters and dropped
+    by the signals in api.signals when the cache_namespace changes."""
+
+    cache_namespace = None
+
+    def list(self, request, *args, **kwargs):
+        return self.cached_response(super().list, request, *args, **kwargs)
+
+    def cached_response(self, handler, request, *args, **kwargs):
+        if not request.user.is_anonymous:
+            return handler(request, *args, **kwargs)
+        key = make_key(self.cache_namespace, request.get_full_path())
+        data = cache.get(key)
+        if data is not None:
+            return Response(data)
+        response = handler(request, *args, **kwargs)
+        if response.status_code == status.HTTP_200_OK:
+            cache.set(key, response.data, RESPONSE_CACHE_TIMEOUT)
+        return response
+
+
+class AnonymousCacheDetailMixin(AnonymousCacheMixin):
+    """Caches list and retrieve responses for anonymous users."""
+
+    def retrieve(self, request, *args, **kwargs):
+        return self.cached_response(
+            super().retrieve, request, *args, **kwargs
+        )
+
+
+class ConditionalGetMixin:
+    """Answers conditional GET requests with 304 Not Modified
+    before the queryset and the serializer run.
+    Views provide the validators with get_validators."""
+
+    def list(self, request, *args, **kwargs):
+        return self.conditional_response(
+            super().list, request, *args, **kwargs
+        )
+
+    def retrieve(self, request, *args, **kwargs):
+        return self.conditional_response(
+            super().retrieve, request, *args, **kwargs
+        )
+
+    def get_validators(self):
+        """Pair of ETag and last modification datetime, or None."""
+
+    def conditional_response(self, handler, request, *args, **kwargs):
+        validators = self.get_validators()
+        if validators is None:
+            return handler(request, *args, **kwargs)
+        etag, modified = validators
+        last_modified = calendar.timegm(modified.utctimetuple())
+        response = get_conditional_response(
+            request, etag=etag, last_modified=last_modified
+        )
+        if response is None:
+            response = handler(request, *args, **kwargs)
+        if response.status_code in (
+            status.HTTP_200_OK, status.HTTP_304_NOT_MODIFIED
+        ):
+            response["ETag"] = etag
+            response["Last-Modified"] = http_date(last_modified)
+        return response
+
+
+class SparseColumnsMixin:
+    """Loads only the columns needed by the ?fields= parameter
+    on list and retrieve."""
+
+    def filter_queryset(self, queryset):
+        queryset = super().filter_queryset(queryset)
+        if self.action not in ("list", "retrieve") or not requested_fields(
+            self.request
+        ):
+            return queryset
+        return self.get_sparse_queryset(
+            queryset, set(self.get_serializer().fields)
+        )
+
+    def get_sparse_queryset(self, queryset, fields):
+        """Restrict the queryset to the columns of the serializer fields.
+        Joins of relations that are not rendered are dropped."""
+
+        columns = {
+            field.name for field in queryset.model._meta.concrete_fields
+        }
+        related = queryset.query.select_related
+        if isinstance(related, dict):
+            queryset = queryset.select_related(None).select_related(
+                *(name for name in related if name in fields)
+            )
+        return queryset.only("pk", *(fields & columns))
+
+
+class ValuesListMixin:
+    """Serves list from values() rows when use_values_list allows it,
+    without model instances and serializers.
+    Views set values_fields and turn a page of rows into the
+    response data with build_rows."""
+
+    values_fields = ()
+
+    def use_values_list(self):
+        return True
+
+    def build_rows(self, values):
+        raise NotImplementedError
+
+    def list(self, request, *args, **kwargs):
+        if not self.use_values_list():
+            return super().list(request, *args, **kwargs)
+        queryset = self.filter_queryset(self.get_queryset())
+        queryset = queryset.prefetch_related(None).values(*self.values_fields)
+        page = self.paginate_queryset(queryset)
+        if page is not None:
+            return self.get_paginated_response(self.build_rows(page))
+        return Response(self.build_rows(queryset))
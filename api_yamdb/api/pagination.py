@@ -0,0 +1,50 @@
+from rest_framework.exceptions import ValidationError
+from rest_framework.filters import OrderingFilter
+from rest_framework.pagination import CursorPagination, PageNumberPagination
+
+from .messages import MESSAGES
+
+
+class OptionalCursorPagination(PageNumberPagination):
+    """Page number pagination by default.
+    Switches to keyset pagination when the request has the cursor
+    parameter, so deep pages cost the same as the first one.
+    Keyset pagination needs the fixed unique ordering of the class,
+    so it is refused together with the ordering parameter, which would
+    replace it with nullable and duplicate keys and skip rows."""
+
+    cursor_query_param = "cursor"
+    ordering = None
+
+    def paginate_queryset(self, queryset, request, view=None):
+        self.cursor_paginator = None
+        if self.cursor_query_param in request.query_params:
+            if OrderingFilter.ordering_param in request.query_params:
+                raise ValidationError(
+                    {self.cursor_query_param: MESSAGES["cursor_ordering"]}
+                )
+            self.cursor_paginator = CursorPagination()
+            self.cursor_paginator.cursor_query_param = self.cursor_query_param
+            self.cursor_paginator.ordering = self.ordering
+            self.cursor_paginator.page_size = self.page_size
+            return self.cursor_paginator.paginate_queryset(
+                queryset, request, view
+            )
+        return super().paginate_queryset(queryset, request, view)
+
+    def get_paginated_response(self, data):
+        if self.cursor_paginator is not None:
+            return self.cursor_paginator.get_paginated_response(data)
+        return super().get_paginated_response(data)
+
+
+class TitlePagination(OptionalCursorPagination):
+    """Pagination for titles, keyset ordered by name, year and id."""
+
+    ordering = ("name", "year", "id")
+
+
+class PubDatePagination(OptionalCursorPagination):
+    """Pagination for reviews and comments, newest first."""
+
+    ordering = ("-pub_date", "id")
@@ -0,0 +1,89 @@
+import logging
+import os
+import shutil
+import tempfile
+from urllib.parse import urlsplit
+
+from django.conf import settings
+from django.test import RequestFactory
+from django.urls import reverse
+
+from .views import CategoryViewSet, GenreViewSet
+
+logger = logging.getLogger(__name__)
+
+PUBLISHED_LISTS = {
+    "genres": GenreViewSet,
+    "categories": CategoryViewSet,
+}
+
+
+def published_root():
+    """Directory of the published lists, None when publishing is off."""
+
+    return getattr(settings, "PUBLISHED_LISTS_ROOT", None)
+
+
+def published_url():
+    """Site URL of the links in the published pages, None when unset."""
+
+    return getattr(settings, "PUBLISHED_LISTS_URL", None)
+
+
+def render_pages(namespace):
+    """Rendered pages of the anonymous list of the namespace, as the API
+    answers them for the host of PUBLISHED_LISTS_URL."""
+
+    url = urlsplit(published_url())
+    view = PUBLISHED_LISTS[namespace].as_view({"get": "list"})
+    factory = RequestFactory(HTTP_HOST=url.netloc)
+    path = reverse(f"api:{namespace}-list")
+    page = 1
+    while True:
+        request = factory.get(
+            path, {"page": page} if page > 1 else {},
+            secure=url.scheme == "https",
+        )
+        response = view(request)
+        yield response.render().content
+        if not response.data.get("next"):
+            return
+        page += 1
+
+
+def write_file(directory, name, content):
+    """Replace the file at once, nginx never serves a partial page."""
+
+    descriptor, temporary = tempfile.mkstemp(dir=directory, suffix=".tmp")
+    with os.fdopen(descriptor, "wb") as file:
+        file.write(content)
+    os.chmod(temporary, 0o644)
+    os.replace(temporary, os.path.join(directory, name))
+
+
+def publish(namespace):
+    """Write the pages of the list of the namespace as JSON files that
+    nginx serves in place of the API. On failure the files are removed,
+    so requests fall back to the API instead of stale pages."""
+
+    root = published_root()
+    if not root:
+        return
+    if not published_url():
+        logger.error(
+            "Not publishing the %s list: PUBLISHED_LISTS_URL is not set",
+            namespace,
+        )
+        return
+    directory = os.path.join(root, namespace)
+    try:
+        os.makedirs(directory, exist_ok=True)
+        names = set()
+        for page, content in enumerate(render_pages(namespace), 1):
+            names.add(f"page-{page}.json")
+            write_file(directory, f"page-{page}.json", content)
+        for name in set(os.listdir(directory)) - names:
+            os.remove(os.path.join(directory, name))
+    except OSError:
+        logger.exception("Could not publish the %s list", namespace)
+        shutil.rmtree(directory, ignore_errors=True)
@@ -1,13 +1,54 @@
+from collections import OrderedDict, defaultdict
+
+from django.db.models import prefetch_related_objects
 from django.shortcuts import get_object_or_404
 from rest_framework import serializers
 from rest_framework.relations import SlugRelatedField
+from rest_framework.settings import api_settings
 from reviews.models import Category, Comment, Genre, Review, Title
 from users.models import User
 
+from .cache import CATEGORY_SLUGS, GENRE_SLUGS
 from .messages import MESSAGES
 
+FIELDS_PARAM = "fields"
+TITLES_BULK_MAX_SIZE = 1000
+TITLE_VALUES = (
+    "id",
+    "name",
+    "year",
+    "rating",
+    "description",
+    "category_id",
+    "score_sum",
+    "reviews_count",
+)
+
+
+def requested_fields(request):
+    """Field names of the ?fields= parameter of a read request, or None."""
+
+    if request is None or request.method != "GET":
+        return None
+    value = request.query_params.get(FIELDS_PARAM)
+    if not value:
+        return None
+    return {name.strip() for name in value.split(",")}
+
+
+class SparseFieldsMixin:
+    """Keeps only the fields listed in the ?fields= parameter.
+    Unknown names are ignored; when none is known all fields stay."""
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        fields = requested_fields(self.context.get("request"))
+        if fields and fields & set(self.fields):
+            for name in set(self.fields) - fields:
+                self.fields.pop(name)
+
 
-class UserSerializer(serializers.ModelSerializer):
+class UserSerializer(SparseFieldsMixin, serializers.ModelSerializer):
     """Serializer for Users."""
 
     class Meta:
@@ -67,29 +108,120 @@ class GenreSerializer(serializers.ModelSerializer):
         lookup_field = "slug"
 
 
+class CachedSlugRelatedField(serializers.SlugRelatedField):
+    """SlugRelatedField resolved from a per-process SlugCache.
+    Slugs missing from the cache are looked up in the database."""
+
+    def __init__(self, slug_cache, **kwargs):
+        self.slug_cache = slug_cache
+        super().__init__(**kwargs)
+
+    def to_internal_value(self, data):
+        try:
+            obj = self.slug_cache.by_slug().get(data)
+        except TypeError:
+            self.fail("invalid")
+        if obj is None:
+            return super().to_internal_value(data)
+        return obj
+
+
+class CachedObjectField(serializers.Field):
+    """Read-only representation of a related object, taken by its
+    primary key from a per-process SlugCache instead of a join.
+    The cache version is checked once per serializer instance."""
+
+    def __init__(self, slug_cache, serializer, **kwargs):
+        self.slug_cache = slug_cache
+        self.serializer = serializer()
+        self.objects = None
+        kwargs["read_only"] = True
+        super().__init__(**kwargs)
+
+    def to_representation(self, value):
+        if self.objects is None:
+            self.objects = self.slug_cache.by_pk()
+        obj = self.slug_cache.get(value, self.objects)
+        if obj is None:
+            return None
+        return self.serializer.to_representation(obj)
+
+
+class TitleListSerializer(serializers.ListSerializer):
+    """Creates a list of titles.
+    The slugs are resolved from the per-process slug caches
+    and the titles are inserted in bulk."""
+
+    def to_internal_value(self, data):
+        if isinstance(data, list) and len(data) > TITLES_BULK_MAX_SIZE:
+            raise serializers.ValidationError({
+                api_settings.NON_FIELD_ERRORS_KEY: [
+                    MESSAGES["bulk_too_many"].format(TITLES_BULK_MAX_SIZE)
+                ]
+            })
+        return super().to_internal_value(data)
+
+    def create(self, validated_data):
+        genres = [item.pop("genre") for item in validated_data]
+        titles = Title.objects.create_with_genres(
+            [Title(**item) for item in validated_data], genres
+        )
+        prefetch_related_objects(titles, "genre")
+        return titles
+
+
 class TitleSerializer(serializers.ModelSerializer):
     """Serializer for Title."""
 
-    genre = serializers.SlugRelatedField(
-        slug_field="slug", many=True, queryset=Genre.objects.all()
+    genre = CachedSlugRelatedField(
+        slug_cache=GENRE_SLUGS,
+        slug_field="slug",
+        many=True,
+        queryset=Genre.objects.all(),
     )
-    category = serializers.SlugRelatedField(
-        slug_field="slug", queryset=Category.objects.all()
+    category = CachedSlugRelatedField(
+        slug_cache=CATEGORY_SLUGS,
+        slug_field="slug",
+        queryset=Category.objects.all(),
     )
 
     class Meta:
         model = Title
-        fields = "__all__"
+        fields = (
+            "id",
+            "name",
+            "year",
+            "rating",
+            "description",
+            "genre",
+            "category",
+        )
+        read_only_fields = ("rating",)
+        list_serializer_class = TitleListSerializer
 
 
-class ReadOnlyTitleSerializer(serializers.ModelSerializer):
-    """Serializer for Title for actions 'retrieve', 'list.'"""
+class ReadOnlyTitleSerializer(SparseFieldsMixin, serializers.ModelSerializer):
+    """Serializer for Title for actions 'retrieve', 'list.'
+    The score histogram is added with the ?histogram=true parameter
+    or when it is listed in ?fields=."""
 
-    rating = serializers.IntegerField(
-        source="reviews__score__avg", read_only=True
-    )
     genre = GenreSerializer(many=True)
-    category = CategorySerializer()
+    category = CachedObjectField(
+        slug_cache=CATEGORY_SLUGS,
+        serializer=CategorySerializer,
+        source="category_id",
+    )
+    score_histogram = serializers.ReadOnlyField()
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        request = self.context.get("request")
+        if "score_histogram" in self.fields and not (
+            request is not None
+            and request.query_params.get("histogram") in ("1", "true")
+            or "score_histogram" in (requested_fields(request) or ())
+        ):
+            self.fields.pop("score_histogram")
 
     class Meta:
         model = Title
@@ -98,13 +230,64 @@ class ReadOnlyTitleSerializer(serializers.ModelSerializer):
             "name",
             "year",
             "rating",
+            "reviews_count",
             "description",
             "genre",
             "category",
+            "score_histogram",
         )
 
 
-class ReviewSerializer(serializers.ModelSerializer):
+def related_row(obj):
+    return OrderedDict((("name", obj.name), ("slug", obj.slug)))
+
+
+def category_row(slug_cache, pk, objects):
+    obj = None if pk is None else slug_cache.get(pk, objects)
+    return None if obj is None else related_row(obj)
+
+
+def title_rows(values):
+    """Titles represented as ReadOnlyTitleSerializer does, without
+    the score histogram, built from values(*TITLE_VALUES) rows.
+    The genre ids of all the rows are loaded with one query, genres
+    and categories come from the per-process slug caches. Relations
+    deleted since the rows were read are left out."""
+
+    values = list(values)
+    genres = defaultdict(list)
+    genre_objects = GENRE_SLUGS.by_pk()
+    category_objects = CATEGORY_SLUGS.by_pk()
+    if values:
+        title_genres = (
+            Title.genre.through.objects.filter(
+                title_id__in=[row["id"] for row in values]
+            )
+            .order_by("genre__name")
+            .values_list("title_id", "genre_id")
+        )
+        for title_id, genre_id in title_genres:
+            genre = GENRE_SLUGS.get(genre_id, genre_objects)
+            if genre is not None:
+                genres[title_id].append(genre)
+    return [
+        OrderedDict((
+            ("id", row["id"]),
+            ("name", row["name"]),
+            ("year", row["year"]),
+            ("rating", row["rating"]),
+            ("reviews_count", row["reviews_count"]),
+            ("description", row["description"]),
+            ("genre", [related_row(genre) for genre in genres[row["id"]]]),
+            ("category", category_row(
+                CATEGORY_SLUGS, row["category_id"], category_objects
+            )),
+        ))
+        for row in values
+    ]
+
+
+class ReviewSerializer(SparseFieldsMixin, serializers.ModelSerializer):
     """Serializer for model Review."""
 
     author = SlugRelatedField(slug_field="username", read_only=True)
@@ -114,13 +297,8 @@ class ReviewSerializer(serializers.ModelSerializer):
         model = Review
         read_only_fields = ("id", "title", "pub_date")
 
-    @staticmethod
-    def check_only_one_review(review):
-        if review:
-            raise serializers.ValidationError(MESSAGES["duplication_review"])
-
 
-class CommentSerializer(serializers.ModelSerializer):
+class CommentSerializer(SparseFieldsMixin, serializers.ModelSerializer):
     """Serializer for model Comment."""
 
     author = SlugRelatedField(slug_field="username", read_only=True)
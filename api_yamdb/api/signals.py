@@ -0,0 +1,42 @@
+from django.db import transaction
+from django.db.models.signals import m2m_changed, post_delete, post_save
+from django.dispatch import receiver
+from reviews.models import Category, Genre, Title
+from reviews.signals import rating_changed, rows_imported, scores_pending
+
+from .cache import CATEGORY_SLUGS, GENRE_SLUGS, invalidate_on_commit
+from .publish import publish
+
+
+@receiver(post_save, sender=Title)
+@receiver(post_delete, sender=Title)
+@receiver(m2m_changed, sender=Title.genre.through)
+@receiver(rating_changed, sender=Title)
+@receiver(scores_pending, sender=Title)
+def invalidate_titles(sender, **kwargs):
+    invalidate_on_commit("titles")
+
+
+@receiver(post_save, sender=Genre)
+@receiver(post_delete, sender=Genre)
+def invalidate_genres(sender, **kwargs):
+    invalidate_on_commit("genres", "titles")
+    transaction.on_commit(GENRE_SLUGS.invalidate)
+    transaction.on_commit(lambda: publish("genres"))
+
+
+@receiver(post_save, sender=Category)
+@receiver(post_delete, sender=Category)
+def invalidate_categories(sender, **kwargs):
+    invalidate_on_commit("categories", "titles")
+    transaction.on_commit(CATEGORY_SLUGS.invalidate)
+    transaction.on_commit(lambda: publish("categories"))
+
+
+@receiver(rows_imported)
+def invalidate_imported(sender, **kwargs):
+    invalidate_on_commit("titles", "genres", "categories")
+    transaction.on_commit(GENRE_SLUGS.invalidate)
+    transaction.on_commit(CATEGORY_SLUGS.invalidate)
+    transaction.on_commit(lambda: publish("genres"))
+    transaction.on_commit(lambda: publish("categories"))
@@ -1,28 +1,67 @@
 from django.conf import settings
 from django.core.mail import send_mail
-from django.db.models import Avg
+from django.db import IntegrityError, transaction
+from django.db.models import Max
+from django.http import Http404, StreamingHttpResponse
 from django.shortcuts import get_object_or_404
 from django_filters.rest_framework import DjangoFilterBackend
 from rest_framework import filters, status, viewsets
 from rest_framework.decorators import action
+from rest_framework.exceptions import ValidationError
 from rest_framework.response import Response
 from rest_framework_simplejwt.tokens import AccessToken
-from reviews.models import Category, Genre, Review, Title
+from reviews.models import (SCORES, Category, Comment, Genre, Review, Title,
+                            TitleRanking, add_pending_scores, histogram_field)
 from users.models import User
 
-from .filters import TitlesFilter
+from .cache import invalidate_on_commit
+from .export import EXPORT_FORMATS
+from .filters import NullsLastOrderingFilter, TitlesFilter
 from .messages import MESSAGES
-from .mixins import ListCreateDestroyViewSet
-from .permissions import (AuthorAdminModeratorOrReadOnly, MeOrAdmin,
-                          PostOnlyNoCreate, RoleAdminrOrReadOnly)
-from .serializers import (CategorySerializer, CommentSerializer,
+from .mixins import (AnonymousCacheDetailMixin, AnonymousCacheMixin,
+                     ConditionalGetMixin, ListCreateDestroyViewSet,
+                     NestedParentMixin, SparseColumnsMixin, ValuesListMixin)
+from .pagination import PubDatePagination, TitlePagination
+from .permissions import (AuthorAdminModeratorOrReadOnly, IsRoleAdmin,
+                          MeOrAdmin, PostOnlyNoCreate, RoleAdminrOrReadOnly)
+from .serializers import (TITLE_VALUES, CategorySerializer, CommentSerializer,
                           GenreSerializer, ReadOnlyTitleSerializer,
                           ReviewSerializer, TitleSerializer,
                           UserConfirmCodeSerializer, UserSerializer,
-                          UserSignupSerializer)
+                          UserSignupSerializer, requested_fields, title_rows)
 
 EMAIL_NOREPLAY_ADDRESS = getattr(settings, "EMAIL_NOREPLAY_ADDRESS", None)
 
+TOP_TITLES_LIMIT = 10
+TOP_TITLES_MAX_LIMIT = 100
+
+
+def title_validators(title_id):
+    """ETag and modification time of a title, its reviews and comments.
+    Score deltas not folded into the title yet count as changes, and so
+    does renaming an author (see reviews.receivers). None for an id
+    that is not a number, the view then answers 404 itself."""
+
+    try:
+        title_id = int(title_id)
+    except (TypeError, ValueError):
+        return None
+    title = (
+        Title.objects.filter(pk=title_id)
+        .order_by()
+        .annotate(
+            last_delta=Max("score_deltas__id"),
+            delta_modified=Max("score_deltas__created"),
+        )
+        .values("version", "modified", "last_delta", "delta_modified")
+        .first()
+    )
+    if title is None:
+        return None
+    etag = f'W/"title-{title_id}-{title["version"]}-{title["last_delta"]}"'
+    modified = max(filter(None, (title["modified"], title["delta_modified"])))
+    return etag, modified
+
 
 class AuthViewSet(viewsets.ModelViewSet):
     """Getting a JWT authorization token in response to a POST request,
@@ -92,7 +131,7 @@ class AuthViewSet(viewsets.ModelViewSet):
         )
 
 
-class UserViewSet(viewsets.ModelViewSet):
+class UserViewSet(SparseColumnsMixin, viewsets.ModelViewSet):
     """ViewSet User Management API.
      Requests to the instance are made by username.
      When accessing /me/, the user completes/gets his entry."""
@@ -108,8 +147,10 @@ class UserViewSet(viewsets.ModelViewSet):
 
         if username == "me":
             username = request.user.username
-        user = get_object_or_404(self.queryset, username=username)
-        serializer = UserSerializer(user)
+        user = get_object_or_404(
+            self.filter_queryset(self.get_queryset()), username=username
+        )
+        serializer = self.get_serializer(user)
         return Response(serializer.data)
 
     def partial_update(self, request, username=None):
@@ -145,9 +186,10 @@ class UserViewSet(viewsets.ModelViewSet):
         return Response(status=status.HTTP_204_NO_CONTENT)
 
 
-class CategoryViewSet(ListCreateDestroyViewSet):
+class CategoryViewSet(AnonymousCacheMixin, ListCreateDestroyViewSet):
     """API for working with category model."""
 
+    cache_namespace = "categories"
     queryset = Category.objects.all()
     serializer_class = CategorySerializer
     permission_classes = (RoleAdminrOrReadOnly,)
@@ -156,9 +198,10 @@ class CategoryViewSet(ListCreateDestroyViewSet):
     lookup_field = "slug"
 
 
-class GenreViewSet(ListCreateDestroyViewSet):
+class GenreViewSet(AnonymousCacheMixin, ListCreateDestroyViewSet):
     """API for working with the genre model."""
 
+    cache_namespace = "genres"
     queryset = Genre.objects.all()
     serializer_class = GenreSerializer
     permission_classes = (RoleAdminrOrReadOnly,)
@@ -167,79 +210,284 @@ class GenreViewSet(ListCreateDestroyViewSet):
     lookup_field = "slug"
 
 
-class TitleViewSet(viewsets.ModelViewSet):
+class TitleViewSet(
+    ConditionalGetMixin,
+    AnonymousCacheDetailMixin,
+    SparseColumnsMixin,
+    ValuesListMixin,
+    viewsets.ModelViewSet,
+):
     """API for work of works."""
 
+    cache_namespace = "titles"
     queryset = (
-        Title.objects.all().annotate(Avg("reviews__score")).order_by("name")
+        Title.objects.prefetch_related("genre")
+        .defer("search_vector")
+        .order_by("name")
     )
     permission_classes = (RoleAdminrOrReadOnly,)
-    filter_backends = [DjangoFilterBackend]
+    filter_backends = [DjangoFilterBackend, NullsLastOrderingFilter]
     filterset_class = TitlesFilter
+    ordering_fields = (
+        "name", "year", "rating", "reviews_count", "weighted_rating"
+    )
+    ordering = TitlePagination.ordering
+    values_fields = TITLE_VALUES
+    pagination_class = TitlePagination
     http_method_names = ["get", "post", "delete", "patch"]
 
+    def use_values_list(self):
+        """The list is built from values() rows unless the request
+        asks for sparse fields or the score histogram."""
+
+        return not (
+            requested_fields(self.request)
+            or "histogram" in self.request.query_params
+        )
+
+    def build_rows(self, values):
+        return title_rows(values)
+
+    def paginate_queryset(self, queryset):
+        """Keyset pagination would replace the search rank ordering
+        by the name ordering of its keys, so it is refused for searches."""
+
+        params = self.request.query_params
+        if "search" in params and (
+            self.paginator.cursor_query_param in params
+        ):
+            raise ValidationError(
+                {self.paginator.cursor_query_param: MESSAGES["cursor_search"]}
+            )
+        page = super().paginate_queryset(queryset)
+        if page is not None:
+            add_pending_scores(page)
+        return page
+
+    def get_object(self):
+        title = super().get_object()
+        if self.action == "retrieve":
+            add_pending_scores([title])
+        return title
+
+    def get_sparse_queryset(self, queryset, fields):
+        """Skips the genre prefetch when it is not requested."""
+
+        if "genre" not in fields:
+            queryset = queryset.prefetch_related(None)
+        if fields & {"rating", "reviews_count", "score_histogram"}:
+            fields |= {"rating", "score_sum", "reviews_count"}
+        if "score_histogram" in fields:
+            fields |= {histogram_field(score) for score in SCORES}
+        return super().get_sparse_queryset(queryset, fields)
+
+    def get_validators(self):
+        if self.action == "retrieve":
+            return title_validators(self.kwargs[self.lookup_field])
+        return None
+
+    @action(detail=False)
+    def top(self, request):
+        """Top rated titles of the catalogue, of a genre or of a category.
+        Served from the precomputed TitleRanking leaderboard."""
+
+        return self.cached_response(self.top_response, request)
+
+    def top_response(self, request):
+        params = request.query_params
+        if "genre" in params and "category" in params:
+            return Response(
+                {"detail": MESSAGES["top_one_scope"]},
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+        genre = category = None
+        if "genre" in params:
+            genre = get_object_or_404(Genre, slug=params["genre"])
+        if "category" in params:
+            category = get_object_or_404(Category, slug=params["category"])
+        try:
+            limit = min(int(params["limit"]), TOP_TITLES_MAX_LIMIT)
+        except (KeyError, ValueError):
+            limit = TOP_TITLES_LIMIT
+        rankings = (
+            TitleRanking.objects.top(genre, category)
+            .select_related("title")
+            .prefetch_related("title__genre")
+            .defer("title__search_vector")[:max(limit, 0)]
+        )
+        titles = [ranking.title for ranking in rankings]
+        add_pending_scores(titles)
+        serializer = self.get_serializer(titles, many=True)
+        return Response(serializer.data)
+
+    @action(detail=False, methods=["post"])
+    def bulk(self, request):
+        """Creation of a list of titles in one request.
+        Nothing is created when an item is invalid,
+        the errors are reported per item."""
+
+        serializer = self.get_serializer(data=request.data, many=True)
+        serializer.is_valid(raise_exception=True)
+        serializer.save()
+        invalidate_on_commit(self.cache_namespace)
+        return Response(serializer.data, status=status.HTTP_201_CREATED)
+
+    @action(detail=False, permission_classes=(IsRoleAdmin,))
+    def export(self, request):
+        """The whole catalogue streamed as NDJSON or, with
+        ?file_format=csv, as CSV, in constant memory."""
+
+        file_format = request.query_params.get("file_format", "ndjson")
+        if file_format not in EXPORT_FORMATS:
+            return Response(
+                {"detail": MESSAGES["export_format"].format(
+                    ", ".join(EXPORT_FORMATS)
+                )},
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+        lines, content_type = EXPORT_FORMATS[file_format]
+        values = Title.objects.order_by("id").values(*TITLE_VALUES)
+        response = StreamingHttpResponse(
+            lines(values), content_type=content_type
+        )
+        response["Content-Disposition"] = (
+            f'attachment; filename="titles.{file_format}"'
+        )
+        return response
+
     def get_serializer_class(self):
-        if self.action in ("retrieve", "list"):
+        if self.action in ("retrieve", "list", "top"):
             return ReadOnlyTitleSerializer
         return TitleSerializer
 
 
-class ReviewViewSet(viewsets.ModelViewSet):
+class ReviewViewSet(
+    ConditionalGetMixin,
+    NestedParentMixin,
+    SparseColumnsMixin,
+    viewsets.ModelViewSet,
+):
     """Class api for model Review."""
 
     serializer_class = ReviewSerializer
     permission_classes = [AuthorAdminModeratorOrReadOnly]
+    pagination_class = PubDatePagination
     http_method_names = ["get", "post", "delete", "patch"]
 
+    parent_lookups = {"title_id": "title_id"}
+
+    filter_backends = [NullsLastOrderingFilter]
+    ordering_fields = ("pub_date", "score", "comments_count")
+    ordering = PubDatePagination.ordering
+
     def get_queryset(self):
-        title = get_object_or_404(Title, pk=self.kwargs.get("title_id"))
-        return title.reviews.all()
+        return Review.objects.filter(
+            **self.get_parent_filter()
+        ).select_related("author")
 
-    def perform_create(self, serializer):
-        title = get_object_or_404(Title, pk=self.kwargs.get("title_id"))
-        review = Review.objects.filter(author=self.request.user, title=title)
-        serializer.check_only_one_review(review)
-        serializer.save(author=self.request.user, title=title)
+    def parent_exists(self):
+        return Title.objects.filter(pk=self.kwargs.get("title_id")).exists()
 
-        title.rating = title.reviews.all().aggregate(Avg("score"))[
-            "score__avg"
-        ]
-        title.save()
+    def get_validators(self):
+        return title_validators(self.kwargs.get("title_id"))
 
-    def perform_update(self, serializer):
-        title = get_object_or_404(Title, pk=self.kwargs.get("title_id"))
-        serializer.save()
+    def perform_create(self, serializer):
+        """Adds the score to the title and inserts the review in one
+        transaction. The rating update tells whether the title exists,
+        the unique constraint rejects a second review of the author."""
+
+        title_id = self.kwargs.get("title_id")
+        score = serializer.validated_data["score"]
+        try:
+            with transaction.atomic():
+                titles = Title.objects.filter(pk=title_id)
+                if not titles.update_rating(new_score=score):
+                    raise Http404
+                serializer.save(author=self.request.user, title_id=title_id)
+        except IntegrityError:
+            raise ValidationError(MESSAGES["duplication_review"])
 
-        title.rating = title.reviews.all().aggregate(Avg("score"))[
-            "score__avg"
-        ]
-        title.save()
+    def perform_update(self, serializer):
+        with transaction.atomic():
+            old_score = (
+                Review.objects.select_for_update()
+                .values_list("score", flat=True)
+                .get(pk=serializer.instance.pk)
+            )
+            review = serializer.save()
+            titles = Title.objects.filter(pk=review.title_id)
+            if not titles.update_rating(old_score, review.score):
+                titles.touch()
 
     def perform_destroy(self, instance):
-        title = get_object_or_404(Title, pk=self.kwargs.get("title_id"))
-        instance.delete()
-
-        title.rating = title.reviews.all().aggregate(Avg("score"))[
-            "score__avg"
-        ]
-        title.save()
+        """The score is removed only by the request that deleted
+        the review, concurrent deletes do not count it twice."""
+
+        with transaction.atomic():
+            _, deleted = Review.objects.filter(pk=instance.pk).delete()
+            if deleted.get(Review._meta.label):
+                Title.objects.filter(pk=instance.title_id).update_rating(
+                    old_score=instance.score
+                )
 
 
-class CommentViewSet(viewsets.ModelViewSet):
+class CommentViewSet(
+    ConditionalGetMixin,
+    NestedParentMixin,
+    SparseColumnsMixin,
+    viewsets.ModelViewSet,
+):
     """Class api for model Comment."""
 
     serializer_class = CommentSerializer
     permission_classes = [AuthorAdminModeratorOrReadOnly]
+    pagination_class = PubDatePagination
     http_method_names = ["get", "post", "delete", "patch"]
 
+    parent_lookups = {"review_id": "review_id", "title_id": "review__title_id"}
+
     def get_queryset(self):
-        title = get_object_or_404(Title, pk=self.kwargs.get("title_id"))
-        review = get_object_or_404(
-            Review, pk=self.kwargs.get("review_id"), title=title
-        )
-        return review.comments.all()
+        return Comment.objects.filter(
+            **self.get_parent_filter()
+        ).select_related("author")
+
+    def parent_exists(self):
+        """The review belongs to the title of the url.
+        One query, the title exists if one of its reviews does."""
+
+        return Review.objects.filter(
+            pk=self.kwargs.get("review_id"),
+            title_id=self.kwargs.get("title_id"),
+        ).exists()
+
+    def get_validators(self):
+        return title_validators(self.kwargs.get("title_id"))
 
     def perform_create(self, serializer):
-        get_object_or_404(Title, pk=self.kwargs.get("title_id"))
-        review = get_object_or_404(Review, pk=self.kwargs.get("review_id"))
-        serializer.save(author=self.request.user, review=review)
+        """Counts the comment on its review and inserts it in one
+        transaction. The count update also checks that the review
+        belongs to the title of the url."""
+
+        review_id = self.kwargs.get("review_id")
+        title_id = self.kwargs.get("title_id")
+        with transaction.atomic():
+            reviews = Review.objects.filter(pk=review_id, title_id=title_id)
+            if not reviews.update_comments_count(1):
+                raise Http404
+            serializer.save(author=self.request.user, review_id=review_id)
+        Title.objects.filter(pk=title_id).touch()
+
+    def perform_update(self, serializer):
+        serializer.save()
+        Title.objects.filter(pk=self.kwargs.get("title_id")).touch()
+
+    def perform_destroy(self, instance):
+        """The comment is uncounted only by the request that deleted it."""
+
+        with transaction.atomic():
+            _, deleted = Comment.objects.filter(pk=instance.pk).delete()
+            if deleted.get(Comment._meta.label):
+                Review.objects.filter(
+                    pk=instance.review_id
+                ).update_comments_count(-1)
+        Title.objects.filter(pk=self.kwargs.get("title_id")).touch()
@@ -23,8 +23,8 @@ INSTALLED_APPS = [
     "django.contrib.staticfiles",
     'django_filters',
     "rest_framework",
-    "reviews",
-    "api",
+    "reviews.apps.ReviewsConfig",
+    "api.apps.ApiConfig",
 ]
 
 MIDDLEWARE = [
@@ -74,6 +74,32 @@ DATABASES = {
 }
 
 
+CACHES = {
+    "default": {
+        "BACKEND": os.getenv(
+            "CACHE_BACKEND",
+            default="django.core.cache.backends.locmem.LocMemCache",
+        ),
+        "LOCATION": os.getenv("CACHE_LOCATION", default="yamdb"),
+    }
+}
+
+RESPONSE_CACHE_TIMEOUT = 60 * 10
+
+# Genre and category list pages written for nginx on every change,
+# with the links of the pages pointing to the site at PUBLISHED_LISTS_URL.
+PUBLISHED_LISTS_ROOT = os.getenv("PUBLISHED_LISTS_ROOT")
+PUBLISHED_LISTS_URL = os.getenv("PUBLISHED_LISTS_URL")
+
+TITLE_SEARCH_CONFIG = "english"
+
+WEIGHTED_RATING_MIN_VOTES = 10
+
+# Record review scores as deltas folded into titles by fold_score_deltas,
+# so reviews of one title do not wait on its row lock.
+RATING_DELTAS = os.getenv("RATING_DELTAS", default="False") == "True"
+
+
 AUTH_PASSWORD_VALIDATORS = [
     {
         "NAME": "django.contrib.auth.password_validation.UserAttributeSimilarityValidator",
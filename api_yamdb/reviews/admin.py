@@ -1,9 +1,70 @@
 from django.contrib import admin
+from django.db import transaction
 
 from .models import Category, Comment, Genre, Review, Title
 
 admin.site.register(Genre)
 admin.site.register(Category)
 admin.site.register(Title)
-admin.site.register(Review)
-admin.site.register(Comment)
+
+
+@admin.register(Review)
+class ReviewAdmin(admin.ModelAdmin):
+    """Keeps the ratings of the titles in sync with admin writes."""
+
+    def save_model(self, request, obj, form, change):
+        with transaction.atomic():
+            old_title_id = old_score = None
+            if change:
+                old_title_id, old_score = (
+                    Review.objects.select_for_update()
+                    .values_list("title_id", "score")
+                    .get(pk=obj.pk)
+                )
+            super().save_model(request, obj, form, change)
+            if old_title_id not in (None, obj.title_id):
+                Title.objects.filter(pk=old_title_id).update_rating(
+                    old_score=old_score
+                )
+                old_score = None
+            titles = Title.objects.filter(pk=obj.title_id)
+            if not titles.update_rating(old_score, obj.score):
+                titles.touch()
+
+    def delete_model(self, request, obj):
+        Review.objects.filter(pk=obj.pk).delete_with_ratings()
+
+    def delete_queryset(self, request, queryset):
+        queryset.delete_with_ratings()
+
+
+@admin.register(Comment)
+class CommentAdmin(admin.ModelAdmin):
+    """Keeps the comment counts of the reviews in sync with admin writes."""
+
+    def save_model(self, request, obj, form, change):
+        with transaction.atomic():
+            old_review_id = None
+            if change:
+                old_review_id = (
+                    Comment.objects.select_for_update()
+                    .values_list("review_id", flat=True)
+                    .get(pk=obj.pk)
+                )
+            super().save_model(request, obj, form, change)
+            if old_review_id != obj.review_id:
+                Review.objects.filter(
+                    pk=obj.review_id
+                ).update_comments_count(1)
+                Review.objects.filter(
+                    pk=old_review_id
+                ).update_comments_count(-1)
+            Title.objects.filter(
+                reviews__in=[obj.review_id, old_review_id]
+            ).touch()
+
+    def delete_model(self, request, obj):
+        Comment.objects.filter(pk=obj.pk).delete_with_counts()
+
+    def delete_queryset(self, request, queryset):
+        queryset.delete_with_counts()
@@ -4,3 +4,6 @@ from django.apps import AppConfig
 class ReviewsConfig(AppConfig):
     name = "reviews"
     verbose_name = "Reviews for works"
+
+    def ready(self):
+        from . import receivers  # noqa: F401
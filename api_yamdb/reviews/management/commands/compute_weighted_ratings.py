@@ -0,0 +1,52 @@
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from reviews.models import Review, Title
+from reviews.ratings import CHUNK_SIZE, aggregate_scores, weighted_ratings
+from reviews.signals import rating_changed
+
+BATCH_SIZE = 1000
+
+
+class Command(BaseCommand):
+    help = "Recompute the Bayesian weighted rating of all titles."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--min-votes",
+            type=int,
+            default=getattr(settings, "WEIGHTED_RATING_MIN_VOTES", 10),
+            help="Number of reviews a title needs to outweigh the prior.",
+        )
+        parser.add_argument("--chunk-size", type=int, default=CHUNK_SIZE)
+
+    def handle(self, *args, **options):
+        scores = (
+            Review.objects.order_by()
+            .values_list("title_id", "score")
+            .iterator(chunk_size=options["chunk_size"])
+        )
+        sums, counts = aggregate_scores(scores, options["chunk_size"])
+        ratings = weighted_ratings(sums, counts, options["min_votes"])
+        # Titles without reviews get the prior, the mean of all scores.
+        prior = None
+        if len(counts):
+            prior = round(float(sums.sum() / counts.sum()), 4)
+
+        changed = []
+        titles = Title.objects.order_by().values_list("id", "weighted_rating")
+        for title_id, stored in titles.iterator():
+            rating = prior
+            if title_id < len(ratings):
+                rating = round(float(ratings[title_id]), 4)
+            if rating != stored:
+                changed.append(Title(id=title_id, weighted_rating=rating))
+        for start in range(0, len(changed), BATCH_SIZE):
+            batch = changed[start:start + BATCH_SIZE]
+            Title.objects.bulk_update(batch, ["weighted_rating"])
+            rating_changed.send(
+                sender=Title,
+                queryset=Title.objects.filter(
+                    pk__in=[title.id for title in batch]
+                ),
+            )
+        self.stdout.write(f"Updated weighted rating of {len(changed)} titles")
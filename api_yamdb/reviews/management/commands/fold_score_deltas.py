@@ -0,0 +1,13 @@
+from django.core.management.base import BaseCommand
+from reviews.models import ScoreDelta
+
+
+class Command(BaseCommand):
+    help = (
+        "Apply the recorded review score deltas to the stored ratings "
+        "of their titles (RATING_DELTAS mode)."
+    )
+
+    def handle(self, *args, **options):
+        folded = ScoreDelta.objects.fold()
+        self.stdout.write(f"Folded {folded} score deltas")
@@ -0,0 +1,34 @@
+from django.core.management.base import BaseCommand
+from reviews.models import Review
+
+BATCH_SIZE = 1000
+
+
+class Command(BaseCommand):
+    help = (
+        "Find reviews whose stored comment count drifted from their "
+        "comments and recompute it."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--dry-run",
+            action="store_true",
+            help="Only report the reviews with drift.",
+        )
+
+    def handle(self, *args, **options):
+        drifted = list(
+            Review.objects.comments_count_drift()
+            .order_by("pk")
+            .values_list("pk", flat=True)
+        )
+        if options["dry_run"]:
+            for review_id in drifted:
+                self.stdout.write(f"Review {review_id} drifted")
+        else:
+            for start in range(0, len(drifted), BATCH_SIZE):
+                Review.objects.filter(
+                    pk__in=drifted[start:start + BATCH_SIZE]
+                ).recompute_comments_count()
+        self.stdout.write(f"Found drift in {len(drifted)} reviews")
@@ -0,0 +1,75 @@
+from django.core.management.base import BaseCommand
+from reviews.models import (SCORES, Review, Title, add_pending_scores,
+                            histogram_field)
+from reviews.ratings import CHUNK_SIZE, aggregate_scores, chunked
+
+BATCH_SIZE = 1000
+
+
+class Command(BaseCommand):
+    help = (
+        "Find titles whose stored rating fields drifted from their reviews "
+        "and recompute them."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--chunk-size", type=int, default=CHUNK_SIZE)
+        parser.add_argument(
+            "--dry-run",
+            action="store_true",
+            help="Only report the titles with drift.",
+        )
+
+    def handle(self, *args, **options):
+        drifted = self.find_drift(options["chunk_size"])
+        if options["dry_run"]:
+            for title_id in drifted:
+                self.stdout.write(f"Title {title_id} drifted")
+        else:
+            for start in range(0, len(drifted), BATCH_SIZE):
+                Title.objects.filter(
+                    pk__in=drifted[start:start + BATCH_SIZE]
+                ).recompute_rating()
+        self.stdout.write(f"Found drift in {len(drifted)} titles")
+
+    def find_drift(self, chunk_size):
+        """Ids of the titles whose stored rating fields differ from
+        their reviews, aggregated in chunks with numpy. Score deltas
+        not folded yet are added to the stored fields first, they are
+        pending changes rather than drift."""
+
+        scores = (
+            Review.objects.order_by()
+            .values_list("title_id", "score")
+            .iterator(chunk_size=chunk_size)
+        )
+        sums, counts, buckets = aggregate_scores(
+            scores, chunk_size, histogram=True
+        )
+        fields = ["score_sum", "reviews_count", "rating"]
+        fields += [histogram_field(score) for score in SCORES]
+        titles = Title.objects.order_by().values("id", *fields)
+        drifted = []
+        # The pending deltas are read for a bounded number of titles
+        # at a time, to stay under the query parameter limits.
+        for chunk in chunked(titles.iterator(chunk_size=chunk_size),
+                             BATCH_SIZE):
+            add_pending_scores(chunk)
+            drifted += [
+                row["id"] for row in chunk
+                if [row[field] for field in fields] != self.expected(
+                    row["id"], sums, counts, buckets
+                )
+            ]
+        return drifted
+
+    @staticmethod
+    def expected(title_id, sums, counts, buckets):
+        if title_id >= len(sums) or not counts[title_id]:
+            return [0, 0, None] + [0] * len(SCORES)
+        return [
+            int(sums[title_id]),
+            int(counts[title_id]),
+            int(sums[title_id] // counts[title_id]),
+            *buckets[title_id, list(SCORES)].tolist(),
+        ]
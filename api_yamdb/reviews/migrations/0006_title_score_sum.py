@@ -0,0 +1,41 @@
+# Generated by Django 2.2.16 on 2026-10-18 19:48
+
+from django.db import migrations, models
+from django.db.models import Count, Sum
+
+
+def fill_score_sum(apps, schema_editor):
+    Title = apps.get_model('reviews', 'Title')
+    Review = apps.get_model('reviews', 'Review')
+    totals = (
+        Review.objects.order_by()
+        .values('title_id')
+        .annotate(total=Sum('score'), count=Count('id'))
+    )
+    for row in totals:
+        Title.objects.filter(pk=row['title_id']).update(
+            score_sum=row['total'],
+            reviews_count=row['count'],
+            rating=row['total'] // row['count'],
+        )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('reviews', '0005_auto_20221229_2142'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='title',
+            name='reviews_count',
+            field=models.PositiveIntegerField(default=0, editable=False, help_text='Number of reviews of the product', verbose_name='Reviews count'),
+        ),
+        migrations.AddField(
+            model_name='title',
+            name='score_sum',
+            field=models.PositiveIntegerField(default=0, editable=False, help_text='Sum of the scores of all reviews of the product', verbose_name='Score sum'),
+        ),
+        migrations.RunPython(fill_score_sum, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,56 @@
+# Generated by Django 2.2.16 on 2026-10-18 19:54
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+def fill_rankings(apps, schema_editor):
+    Title = apps.get_model('reviews', 'Title')
+    TitleRanking = apps.get_model('reviews', 'TitleRanking')
+    rankings = []
+    titles = Title.objects.filter(rating__isnull=False).prefetch_related('genre')
+    for title in titles:
+        scopes = [{}]
+        if title.category_id is not None:
+            scopes.append({'category_id': title.category_id})
+        scopes += [{'genre_id': genre.id} for genre in title.genre.all()]
+        rankings += [
+            TitleRanking(
+                title_id=title.id,
+                rating=title.rating,
+                reviews_count=title.reviews_count,
+                **scope
+            )
+            for scope in scopes
+        ]
+    TitleRanking.objects.bulk_create(rankings, batch_size=1000)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('reviews', '0009_trigram_indexes'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='TitleRanking',
+            fields=[
+                ('id', models.AutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('rating', models.IntegerField(help_text='Copy of the product rating', verbose_name='Product Rating')),
+                ('reviews_count', models.PositiveIntegerField(help_text='Copy of the product reviews count', verbose_name='Reviews count')),
+                ('category', models.ForeignKey(help_text='Category leaderboard of the row', null=True, on_delete=django.db.models.deletion.CASCADE, related_name='rankings', to='reviews.Category', verbose_name='Category')),
+                ('genre', models.ForeignKey(help_text='Genre leaderboard of the row', null=True, on_delete=django.db.models.deletion.CASCADE, related_name='rankings', to='reviews.Genre', verbose_name='Genre')),
+                ('title', models.ForeignKey(help_text='Ranked product', on_delete=django.db.models.deletion.CASCADE, related_name='rankings', to='reviews.Title', verbose_name='Product')),
+            ],
+            options={
+                'verbose_name': 'Product ranking',
+                'verbose_name_plural': 'Product rankings',
+            },
+        ),
+        migrations.AddIndex(
+            model_name='titleranking',
+            index=models.Index(fields=['genre', 'category', '-rating', '-reviews_count', 'title'], name='ranking_top_idx'),
+        ),
+        migrations.RunPython(fill_rankings, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,37 @@
+# Generated by Django 2.2.16 on 2026-10-18 19:56
+
+from django.db import migrations, models
+
+
+def create_weighted_rating_index(apps, schema_editor):
+    # Matches the NULLS LAST ordering of the titles ordering filter.
+    if schema_editor.connection.vendor != 'postgresql':
+        return
+    schema_editor.execute(
+        'CREATE INDEX title_weighted_rating_idx ON reviews_title '
+        '(weighted_rating DESC NULLS LAST, id)'
+    )
+
+
+def drop_weighted_rating_index(apps, schema_editor):
+    if schema_editor.connection.vendor != 'postgresql':
+        return
+    schema_editor.execute('DROP INDEX IF EXISTS title_weighted_rating_idx')
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('reviews', '0010_title_ranking'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='title',
+            name='weighted_rating',
+            field=models.FloatField(editable=False, help_text='Bayesian rating recomputed by compute_weighted_ratings', null=True, verbose_name='Weighted rating'),
+        ),
+        migrations.RunPython(
+            create_weighted_rating_index, drop_weighted_rating_index
+        ),
+    ]
@@ -0,0 +1,79 @@
+# Generated by Django 2.2.16 on 2026-10-18 19:58
+
+from django.db import migrations, models
+from django.db.models import Count
+
+
+def fill_score_histogram(apps, schema_editor):
+    Title = apps.get_model('reviews', 'Title')
+    Review = apps.get_model('reviews', 'Review')
+    buckets = (
+        Review.objects.order_by()
+        .values('title_id', 'score')
+        .annotate(count=Count('id'))
+    )
+    for row in buckets:
+        Title.objects.filter(pk=row['title_id']).update(
+            **{f"score_{row['score']}_count": row['count']}
+        )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('reviews', '0011_title_weighted_rating'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='title',
+            name='score_10_count',
+            field=models.PositiveIntegerField(default=0, editable=False, help_text='Number of reviews with the score 10', verbose_name='Reviews scored 10'),
+        ),
+        migrations.AddField(
+            model_name='title',
+            name='score_1_count',
+            field=models.PositiveIntegerField(default=0, editable=False, help_text='Number of reviews with the score 1', verbose_name='Reviews scored 1'),
+        ),
+        migrations.AddField(
+            model_name='title',
+            name='score_2_count',
+            field=models.PositiveIntegerField(default=0, editable=False, help_text='Number of reviews with the score 2', verbose_name='Reviews scored 2'),
+        ),
+        migrations.AddField(
+            model_name='title',
+            name='score_3_count',
+            field=models.PositiveIntegerField(default=0, editable=False, help_text='Number of reviews with the score 3', verbose_name='Reviews scored 3'),
+        ),
+        migrations.AddField(
+            model_name='title',
+            name='score_4_count',
+            field=models.PositiveIntegerField(default=0, editable=False, help_text='Number of reviews with the score 4', verbose_name='Reviews scored 4'),
+        ),
+        migrations.AddField(
+            model_name='title',
+            name='score_5_count',
+            field=models.PositiveIntegerField(default=0, editable=False, help_text='Number of reviews with the score 5', verbose_name='Reviews scored 5'),
+        ),
+        migrations.AddField(
+            model_name='title',
+            name='score_6_count',
+            field=models.PositiveIntegerField(default=0, editable=False, help_text='Number of reviews with the score 6', verbose_name='Reviews scored 6'),
+        ),
+        migrations.AddField(
+            model_name='title',
+            name='score_7_count',
+            field=models.PositiveIntegerField(default=0, editable=False, help_text='Number of reviews with the score 7', verbose_name='Reviews scored 7'),
+        ),
+        migrations.AddField(
+            model_name='title',
+            name='score_8_count',
+            field=models.PositiveIntegerField(default=0, editable=False, help_text='Number of reviews with the score 8', verbose_name='Reviews scored 8'),
+        ),
+        migrations.AddField(
+            model_name='title',
+            name='score_9_count',
+            field=models.PositiveIntegerField(default=0, editable=False, help_text='Number of reviews with the score 9', verbose_name='Reviews scored 9'),
+        ),
+        migrations.RunPython(fill_score_histogram, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,28 @@
+# Generated by Django 2.2.16 on 2026-10-18 20:28
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('reviews', '0013_title_version'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ScoreDelta',
+            fields=[
+                ('id', models.AutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('score', models.SmallIntegerField(verbose_name='Rating')),
+                ('delta', models.SmallIntegerField(verbose_name='Review count change')),
+                ('created', models.DateTimeField(auto_now_add=True)),
+                ('title', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='score_deltas', to='reviews.Title', verbose_name='Product')),
+            ],
+            options={
+                'verbose_name': 'Score delta',
+                'verbose_name_plural': 'Score deltas',
+            },
+        ),
+    ]
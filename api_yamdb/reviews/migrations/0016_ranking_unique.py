@@ -0,0 +1,40 @@
+# Generated by Django 2.2.16 on 2026-10-18 20:49
+
+from django.db import migrations, models
+from django.db.models import Min
+
+
+def delete_duplicate_rankings(apps, schema_editor):
+    TitleRanking = apps.get_model('reviews', 'TitleRanking')
+    kept = (
+        TitleRanking.objects.order_by()
+        .values('title_id', 'genre_id', 'category_id')
+        .annotate(kept=Min('id'))
+        .values('kept')
+    )
+    TitleRanking.objects.exclude(id__in=list(kept)).delete()
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('reviews', '0015_review_comments_count'),
+    ]
+
+    operations = [
+        migrations.RunPython(
+            delete_duplicate_rankings, migrations.RunPython.noop
+        ),
+        migrations.AddConstraint(
+            model_name='titleranking',
+            constraint=models.UniqueConstraint(condition=models.Q(('category__isnull', True), ('genre__isnull', True)), fields=('title',), name='ranking_unique_global'),
+        ),
+        migrations.AddConstraint(
+            model_name='titleranking',
+            constraint=models.UniqueConstraint(condition=models.Q(genre__isnull=False), fields=('title', 'genre'), name='ranking_unique_genre'),
+        ),
+        migrations.AddConstraint(
+            model_name='titleranking',
+            constraint=models.UniqueConstraint(condition=models.Q(category__isnull=False), fields=('title', 'category'), name='ranking_unique_category'),
+        ),
+    ]
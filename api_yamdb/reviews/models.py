@@ -1,6 +1,16 @@
-from django.db import models
+from collections import Counter, defaultdict
+
+from django.conf import settings
+from django.contrib.postgres.search import (SearchQuery, SearchRank,
+                                            SearchVector, SearchVectorField)
+from django.db import connections, models, transaction
+from django.db.models import (Case, Count, F, IntegerField, Max, OuterRef, Q,
+                              Subquery, Sum, Value, When)
+from django.db.models.functions import Coalesce, Now
+from django.utils import timezone
 from users.models import User
 
+from .signals import rating_changed, scores_pending
 from .validators import validator_year
 
 
@@ -69,6 +79,235 @@ class Category(models.Model):
         return self.slug
 
 
+SEARCH_CONFIG = getattr(settings, "TITLE_SEARCH_CONFIG", "english")
+SCORES = range(1, 11)
+DELETE_BATCH_SIZE = 1000
+
+
+def rating_deltas_enabled():
+    return getattr(settings, "RATING_DELTAS", False)
+
+
+def histogram_field(score):
+    """Name of the Title field counting the reviews with the score."""
+
+    return f"score_{score}_count"
+
+
+def saved_fields(instance, maintained):
+    """Fields written by save() on an existing row: all but the primary
+    key and the maintained fields, which are only changed by relative
+    updates and would be overwritten with stale values otherwise."""
+
+    return [
+        field.name for field in instance._meta.concrete_fields
+        if not field.primary_key and field.name not in maintained
+    ]
+
+
+def score_count_field(score):
+    """Histogram field of Title, see histogram_field for its name."""
+
+    return models.PositiveIntegerField(
+        verbose_name=f"Reviews scored {score}",
+        help_text=f"Number of reviews with the score {score}",
+        default=0,
+        editable=False,
+    )
+
+
+def title_search_vector():
+    return SearchVector(
+        "name", weight="A", config=SEARCH_CONFIG
+    ) + SearchVector("description", weight="B", config=SEARCH_CONFIG)
+
+
+class TitleQuerySet(models.QuerySet):
+    """QuerySet for Title with rating maintenance and full-text search."""
+
+    def supports_full_text(self):
+        return connections[self.db].vendor == "postgresql"
+
+    def touch(self, **changes):
+        """Bump the version and modification time of the titles.
+        They validate conditional GETs of a title and of its reviews
+        and comments."""
+
+        return self.update(version=F("version") + 1, modified=Now(), **changes)
+
+    def update_search_vector(self):
+        """Rebuild the stored tsvector of the titles on PostgreSQL."""
+
+        if not self.supports_full_text():
+            return 0
+        return self.update(search_vector=title_search_vector())
+
+    def create_with_genres(self, titles, genres):
+        """Insert the titles and their genres, genres[i] being the genres
+        of titles[i]. Uses one bulk insert per table when the database
+        returns the primary keys of bulk inserted rows and saves the
+        titles one by one otherwise."""
+
+        connection = connections[self.db]
+        through = self.model.genre.through
+        with transaction.atomic(using=self.db):
+            if connection.features.can_return_ids_from_bulk_insert:
+                self.bulk_create(titles)
+                self.filter(
+                    pk__in=[title.pk for title in titles]
+                ).update_search_vector()
+            else:
+                for title in titles:
+                    title.save(using=self.db)
+            through.objects.using(self.db).bulk_create(
+                through(title_id=title.pk, genre_id=genre_id)
+                for title, title_genres in zip(titles, genres)
+                for genre_id in {genre.pk for genre in title_genres}
+            )
+        return titles
+
+    def search(self, text):
+        """Titles matching the text, most relevant first.
+        Uses the GIN-indexed tsvector on PostgreSQL and falls back
+        to a substring match on other databases."""
+
+        if self.supports_full_text():
+            query = SearchQuery(text, config=SEARCH_CONFIG)
+            rank = SearchRank(F("search_vector"), query)
+            queryset = self.filter(search_vector=query)
+        else:
+            rank = Case(
+                When(name__icontains=text, then=Value(2)),
+                default=Value(1),
+                output_field=IntegerField(),
+            )
+            queryset = self.filter(
+                Q(name__icontains=text) | Q(description__icontains=text)
+            )
+        return queryset.annotate(rank=rank).order_by(
+            "-rank", "name", "year", "id"
+        )
+
+    def update_rating(self, old_score=None, new_score=None):
+        """Apply a review score change to the titles in one UPDATE.
+        old_score is None for a new review, new_score is None for
+        a deleted one. With RATING_DELTAS on, the change is recorded
+        as ScoreDelta rows instead and no title row is written."""
+
+        if old_score == new_score:
+            return 0
+        changes = Counter()
+        if old_score is not None:
+            changes[old_score] -= 1
+        if new_score is not None:
+            changes[new_score] += 1
+        updated = self.shift_scores(changes)
+        if updated:
+            self.scores_changed()
+        return updated
+
+    def shift_scores(self, changes):
+        """Apply the changes of the review count per score, {score: delta},
+        to the titles, or record them as ScoreDelta rows with RATING_DELTAS
+        on. Sends no signal, see scores_changed."""
+
+        if rating_deltas_enabled():
+            return self.add_score_deltas(changes)
+        return self.apply_score_changes(changes)
+
+    def scores_changed(self):
+        """Tell the receivers that the scores of the titles were shifted."""
+
+        signal = scores_pending if rating_deltas_enabled() else rating_changed
+        signal.send(sender=self.model, queryset=self)
+
+    def apply_score_changes(self, changes):
+        """Shift the stored score sum, review count and score histogram
+        by the changes of the review count per score, {score: delta},
+        and recalculate the rating."""
+
+        score_delta = sum(score * delta for score, delta in changes.items())
+        count_delta = sum(changes.values())
+        count = F("reviews_count") + count_delta
+        fields = {
+            "score_sum": F("score_sum") + score_delta,
+            "reviews_count": count,
+            "rating": Case(
+                When(reviews_count__lte=-count_delta, then=Value(None)),
+                default=(F("score_sum") + score_delta) / count,
+                output_field=IntegerField(),
+            ),
+        }
+        for score, delta in changes.items():
+            if delta:
+                field = histogram_field(score)
+                fields[field] = F(field) + delta
+        return self.touch(**fields)
+
+    def add_score_deltas(self, changes):
+        """Record the changes of the review count per score as ScoreDelta
+        rows, so concurrent reviews of a title do not queue on its row.
+        ScoreDelta.objects.fold() applies them to the titles."""
+
+        title_ids = list(self.values_list("pk", flat=True))
+        ScoreDelta.objects.using(self.db).bulk_create(
+            ScoreDelta(title_id=title_id, score=score, delta=delta)
+            for title_id in title_ids
+            for score, delta in changes.items()
+            if delta
+        )
+        return len(title_ids)
+
+    def recompute_rating(self):
+        """Recalculate the stored rating fields of the titles from
+        their reviews and drop their pending score deltas. The title rows
+        are locked first, so review writes running at the same time are
+        neither lost nor counted twice. Delta writers insert rows
+        referencing the title, which waits for that lock on PostgreSQL;
+        only the deltas read before aggregating are dropped all the same,
+        a later one is kept rather than lost."""
+
+        fields = ["score_sum", "reviews_count", "rating"]
+        fields += [histogram_field(score) for score in SCORES]
+        with transaction.atomic(using=self.db):
+            titles = {
+                title.pk: title
+                for title in self.select_for_update().only("pk").order_by("pk")
+            }
+            for title in titles.values():
+                for field in fields:
+                    setattr(title, field, 0)
+            deltas = ScoreDelta.objects.using(self.db).filter(
+                title_id__in=titles
+            )
+            last_delta = deltas.aggregate(last=Max("id"))["last"]
+            buckets = (
+                Review.objects.using(self.db)
+                .filter(title_id__in=titles)
+                .order_by()
+                .values_list("title_id", "score")
+                .annotate(count=Count("id"))
+            )
+            for title_id, score, count in buckets:
+                title = titles[title_id]
+                title.score_sum += score * count
+                title.reviews_count += count
+                setattr(title, histogram_field(score), count)
+            for title in titles.values():
+                title.rating = None
+                if title.reviews_count:
+                    title.rating = title.score_sum // title.reviews_count
+            if last_delta is not None:
+                deltas.filter(id__lte=last_delta).delete()
+            self.model.objects.using(self.db).bulk_update(
+                titles.values(), fields
+            )
+            self.touch()
+        if titles:
+            rating_changed.send(sender=self.model, queryset=self)
+        return len(titles)
+
+
 class Title(models.Model):
     """Model Title."""
 
@@ -88,6 +327,53 @@ class Title(models.Model):
         blank=True,
         null=True,
     )
+    score_sum = models.PositiveIntegerField(
+        verbose_name="Score sum",
+        help_text="Sum of the scores of all reviews of the product",
+        default=0,
+        editable=False,
+    )
+    reviews_count = models.PositiveIntegerField(
+        verbose_name="Reviews count",
+        help_text="Number of reviews of the product",
+        default=0,
+        editable=False,
+    )
+    score_1_count = score_count_field(1)
+    score_2_count = score_count_field(2)
+    score_3_count = score_count_field(3)
+    score_4_count = score_count_field(4)
+    score_5_count = score_count_field(5)
+    score_6_count = score_count_field(6)
+    score_7_count = score_count_field(7)
+    score_8_count = score_count_field(8)
+    score_9_count = score_count_field(9)
+    score_10_count = score_count_field(10)
+    weighted_rating = models.FloatField(
+        verbose_name="Weighted rating",
+        help_text="Bayesian rating recomputed by compute_weighted_ratings",
+        null=True,
+        editable=False,
+    )
+    version = models.PositiveIntegerField(
+        verbose_name="Version",
+        help_text="Incremented on every change of the product, "
+        "its reviews and their comments",
+        default=1,
+        editable=False,
+    )
+    modified = models.DateTimeField(
+        verbose_name="Modification date",
+        help_text="Last change of the product, its reviews and comments",
+        default=timezone.now,
+        editable=False,
+    )
+    search_vector = SearchVectorField(
+        verbose_name="Search vector",
+        help_text="Full-text search document of the name and description",
+        null=True,
+        editable=False,
+    )
     description = models.TextField(
         verbose_name="Description",
         help_text="Brief description of the work",
@@ -109,19 +395,269 @@ class Title(models.Model):
         on_delete=models.SET_NULL,
     )
 
+    objects = TitleQuerySet.as_manager()
+
+    MAINTAINED_FIELDS = (
+        "rating",
+        "score_sum",
+        "reviews_count",
+        "weighted_rating",
+        "version",
+        "modified",
+        "search_vector",
+        *(histogram_field(score) for score in SCORES),
+    )
+
     class Meta:
         verbose_name = "Product"
         verbose_name_plural = "Products"
         ordering = ["name", "year"]
+        indexes = [
+            models.Index(
+                fields=["name", "year", "id"], name="title_name_year_id_idx"
+            ),
+        ]
 
     def __str__(self):
         return self.name
 
+    def save(self, *args, **kwargs):
+        if not self._state.adding and "update_fields" not in kwargs:
+            kwargs["update_fields"] = saved_fields(
+                self, self.MAINTAINED_FIELDS
+            )
+        super().save(*args, **kwargs)
+        titles = Title.objects.filter(pk=self.pk)
+        titles.touch()
+        titles.update_search_vector()
+
+    @property
+    def score_histogram(self):
+        """Number of reviews for each score."""
+
+        return {
+            score: getattr(self, histogram_field(score)) for score in SCORES
+        }
+
+
+class TitleRankingQuerySet(models.QuerySet):
+    """QuerySet for TitleRanking with incremental refresh."""
+
+    def refresh(self, titles):
+        """Rebuild the leaderboard rows of the titles queryset.
+        A rated title gets a global row plus a row for its category
+        and each of its genres. The title rows are locked first, so
+        concurrent refreshes of a title run one after the other."""
+
+        rated = titles.filter(rating__isnull=False).order_by()
+        with transaction.atomic(using=self.db):
+            locked = list(
+                Title.objects.using(self.db)
+                .filter(pk__in=titles.order_by().values("pk"))
+                .select_for_update()
+                .order_by("pk")
+                .values_list("pk", flat=True)
+            )
+            self.filter(title__in=locked).delete()
+            rows = {
+                row["id"]: row
+                for row in rated.values(
+                    "id", "rating", "reviews_count", "category_id"
+                )
+            }
+            if not rows:
+                return
+            rankings = []
+            for row in rows.values():
+                rankings.append(self.model(
+                    title_id=row["id"],
+                    rating=row["rating"],
+                    reviews_count=row["reviews_count"],
+                ))
+                if row["category_id"] is not None:
+                    rankings.append(self.model(
+                        title_id=row["id"],
+                        category_id=row["category_id"],
+                        rating=row["rating"],
+                        reviews_count=row["reviews_count"],
+                    ))
+            title_genres = Title.genre.through.objects.filter(
+                title_id__in=rows
+            ).values_list("title_id", "genre_id")
+            for title_id, genre_id in title_genres:
+                rankings.append(self.model(
+                    title_id=title_id,
+                    genre_id=genre_id,
+                    rating=rows[title_id]["rating"],
+                    reviews_count=rows[title_id]["reviews_count"],
+                ))
+            self.bulk_create(rankings)
+
+    def top(self, genre=None, category=None):
+        """Leaderboard of the whole catalogue, a genre or a category."""
+
+        return self.filter(genre=genre, category=category).order_by(
+            "-rating", "-reviews_count", "title_id"
+        )
+
+
+class TitleRanking(models.Model):
+    """Precomputed leaderboard row of a rated title.
+    Global rows have neither genre nor category."""
+
+    title = models.ForeignKey(
+        Title,
+        verbose_name="Product",
+        help_text="Ranked product",
+        related_name="rankings",
+        on_delete=models.CASCADE,
+    )
+    genre = models.ForeignKey(
+        Genre,
+        verbose_name="Genre",
+        help_text="Genre leaderboard of the row",
+        related_name="rankings",
+        null=True,
+        on_delete=models.CASCADE,
+    )
+    category = models.ForeignKey(
+        Category,
+        verbose_name="Category",
+        help_text="Category leaderboard of the row",
+        related_name="rankings",
+        null=True,
+        on_delete=models.CASCADE,
+    )
+    rating = models.IntegerField(
+        verbose_name="Product Rating",
+        help_text="Copy of the product rating",
+    )
+    reviews_count = models.PositiveIntegerField(
+        verbose_name="Reviews count",
+        help_text="Copy of the product reviews count",
+    )
+
+    objects = TitleRankingQuerySet.as_manager()
+
+    class Meta:
+        verbose_name = "Product ranking"
+        verbose_name_plural = "Product rankings"
+        indexes = [
+            models.Index(
+                fields=[
+                    "genre", "category", "-rating", "-reviews_count", "title"
+                ],
+                name="ranking_top_idx",
+            ),
+        ]
+        constraints = [
+            models.UniqueConstraint(
+                fields=["title"],
+                condition=Q(genre__isnull=True, category__isnull=True),
+                name="ranking_unique_global",
+            ),
+            models.UniqueConstraint(
+                fields=["title", "genre"],
+                condition=Q(genre__isnull=False),
+                name="ranking_unique_genre",
+            ),
+            models.UniqueConstraint(
+                fields=["title", "category"],
+                condition=Q(category__isnull=False),
+                name="ranking_unique_category",
+            ),
+        ]
+
+    def __str__(self):
+        return f"{self.title_id}: {self.rating}"
+
+
+class ReviewQuerySet(models.QuerySet):
+    """QuerySet for Review keeping title ratings in sync on bulk deletes."""
+
+    def delete_with_ratings(self, batch_size=DELETE_BATCH_SIZE):
+        """Delete the reviews in batches, each in its own transaction.
+        Every batch shifts the rating of the affected titles with one
+        set-based update per score, whatever the number of titles.
+        The batch is locked first, so a review deleted meanwhile by
+        another request is not subtracted twice. The receivers are told
+        about the titles once, after the last batch."""
+
+        deleted = 0
+        title_ids = set()
+        while True:
+            with transaction.atomic(using=self.db):
+                batch = list(
+                    self.select_for_update()
+                    .order_by("pk")
+                    .values_list("pk", "title_id", "score")[:batch_size]
+                )
+                if not batch:
+                    break
+                # The locked rows can only be deleted by this transaction,
+                # a review deleted concurrently is no longer selected.
+                title_ids.update(title_id for _, title_id, _ in batch)
+                pending = Counter(
+                    (title_id, score) for _, title_id, score in batch
+                )
+                # A title is shifted once per update, so titles losing
+                # several reviews with the same score take a few rounds.
+                while pending:
+                    titles = defaultdict(list)
+                    for title_id, score in pending:
+                        titles[score].append(title_id)
+                    for score, ids in titles.items():
+                        Title.objects.using(self.db).filter(
+                            pk__in=ids
+                        ).shift_scores({score: -1})
+                    pending -= Counter(pending.keys())
+                self.model.objects.using(self.db).filter(
+                    pk__in=[pk for pk, _, _ in batch]
+                ).delete()
+            deleted += len(batch)
+        title_ids = sorted(title_ids)
+        for start in range(0, len(title_ids), DELETE_BATCH_SIZE):
+            Title.objects.using(self.db).filter(
+                pk__in=title_ids[start:start + DELETE_BATCH_SIZE]
+            ).scores_changed()
+        return deleted
+
+    def update_comments_count(self, delta):
+        """Shift the stored comment count of the reviews in one UPDATE."""
+
+        return self.update(comments_count=F("comments_count") + delta)
+
+    def counted_comments(self):
+        """Number of comments of the review, as a subquery expression."""
+
+        counts = (
+            Comment.objects.using(self.db)
+            .filter(review=OuterRef("pk"))
+            .order_by()
+            .values("review")
+            .annotate(count=Count("id"))
+            .values("count")
+        )
+        return Coalesce(Subquery(counts, output_field=IntegerField()), 0)
+
+    def comments_count_drift(self):
+        """Reviews whose stored comment count differs from their comments."""
+
+        return self.annotate(counted=self.counted_comments()).exclude(
+            comments_count=F("counted")
+        )
+
+    def recompute_comments_count(self):
+        """Recalculate the stored comment count of the reviews
+        from their comments in one UPDATE."""
+
+        return self.update(comments_count=self.counted_comments())
+
 
 class Review(CreatedModel):
     """Model Review for Title."""
 
-    SCORE_CHOICES = ((s, s) for s in range(1, 11))
+    SCORE_CHOICES = ((s, s) for s in SCORES)
     title = models.ForeignKey(
         Title,
         verbose_name="Product",
@@ -145,16 +681,78 @@ class Review(CreatedModel):
         help_text="Rating works from 1 to 10",
         choices=SCORE_CHOICES,
     )
+    comments_count = models.PositiveIntegerField(
+        verbose_name="Comments count",
+        help_text="Number of comments of the review",
+        default=0,
+        editable=False,
+    )
+
+    objects = ReviewQuerySet.as_manager()
+
+    MAINTAINED_FIELDS = ("comments_count",)
 
     class Meta:
         verbose_name = "Review"
         verbose_name_plural = "Reviews"
         ordering = ["-pub_date"]
         unique_together = ["author", "title"]
+        indexes = [
+            models.Index(
+                fields=["title", "-pub_date", "id"],
+                name="review_title_pub_date_idx",
+            ),
+        ]
 
     def __str__(self):
         return self.text[:30]
 
+    def save(self, *args, **kwargs):
+        if not self._state.adding and "update_fields" not in kwargs:
+            kwargs["update_fields"] = saved_fields(
+                self, self.MAINTAINED_FIELDS
+            )
+        super().save(*args, **kwargs)
+
+
+class CommentQuerySet(models.QuerySet):
+    """QuerySet for Comment keeping review comment counts in sync
+    on bulk deletes."""
+
+    def delete_with_counts(self, batch_size=DELETE_BATCH_SIZE):
+        """Delete the comments in batches, each in its own transaction.
+        Every batch lowers the comment count of the affected reviews
+        with one update per number of comments a review lost, and touches
+        their titles, whose comment lists changed."""
+
+        deleted = 0
+        while True:
+            with transaction.atomic(using=self.db):
+                batch = list(
+                    self.select_for_update()
+                    .order_by("pk")
+                    .values_list("pk", "review_id", "review__title_id")[
+                        :batch_size
+                    ]
+                )
+                if not batch:
+                    return deleted
+                reviews = defaultdict(list)
+                counts = Counter(review_id for _, review_id, _ in batch)
+                for review_id, count in counts.items():
+                    reviews[count].append(review_id)
+                for count, review_ids in reviews.items():
+                    Review.objects.using(self.db).filter(
+                        pk__in=review_ids
+                    ).update_comments_count(-count)
+                self.model.objects.using(self.db).filter(
+                    pk__in=[pk for pk, _, _ in batch]
+                ).delete()
+                Title.objects.using(self.db).filter(
+                    pk__in={title_id for _, _, title_id in batch}
+                ).touch()
+            deleted += len(batch)
+
 
 class Comment(CreatedModel):
     """Model Comments for Review."""
@@ -178,10 +776,115 @@ class Comment(CreatedModel):
         on_delete=models.CASCADE,
     )
 
+    objects = CommentQuerySet.as_manager()
+
     class Meta:
         verbose_name = "Comment"
         verbose_name_plural = "Comments"
         ordering = ["-pub_date"]
+        indexes = [
+            models.Index(
+                fields=["review", "-pub_date", "id"],
+                name="comment_review_pub_date_idx",
+            ),
+        ]
 
     def __str__(self):
         return self.text[:15]
+
+
+class ScoreDeltaQuerySet(models.QuerySet):
+    """QuerySet for ScoreDelta folding the deltas into the titles."""
+
+    def fold(self):
+        """Apply the deltas to the stored rating fields of their titles
+        and delete them. The deltas are locked, so concurrent folds
+        never apply one twice. Returns the number of folded deltas."""
+
+        titles = Title.objects.using(self.db)
+        with transaction.atomic(using=self.db):
+            rows = list(
+                self.select_for_update()
+                .order_by("pk")
+                .values_list("pk", "title_id", "score", "delta")
+            )
+            changes = defaultdict(Counter)
+            for _, title_id, score, delta in rows:
+                changes[title_id][score] += delta
+            for title_id in sorted(changes):
+                titles.filter(pk=title_id).apply_score_changes(
+                    changes[title_id]
+                )
+            for start in range(0, len(rows), DELETE_BATCH_SIZE):
+                self.model.objects.using(self.db).filter(pk__in=[
+                    pk for pk, _, _, _ in rows[start:start + DELETE_BATCH_SIZE]
+                ]).delete()
+        title_ids = sorted(changes)
+        for start in range(0, len(title_ids), DELETE_BATCH_SIZE):
+            rating_changed.send(sender=Title, queryset=titles.filter(
+                pk__in=title_ids[start:start + DELETE_BATCH_SIZE]
+            ))
+        return len(rows)
+
+
+class ScoreDelta(models.Model):
+    """Change of the review count of a title for a score, recorded
+    instead of updating the title when RATING_DELTAS is on."""
+
+    title = models.ForeignKey(
+        Title,
+        verbose_name="Product",
+        related_name="score_deltas",
+        on_delete=models.CASCADE,
+    )
+    score = models.SmallIntegerField(verbose_name="Rating")
+    delta = models.SmallIntegerField(verbose_name="Review count change")
+    created = models.DateTimeField(auto_now_add=True)
+
+    objects = ScoreDeltaQuerySet.as_manager()
+
+    class Meta:
+        verbose_name = "Score delta"
+        verbose_name_plural = "Score deltas"
+
+
+def add_pending_scores(titles):
+    """Add the score deltas not folded yet to the rating fields of the
+    titles, Title instances or values() rows, with one query.
+    Does nothing unless RATING_DELTAS is on."""
+
+    if not rating_deltas_enabled() or not titles:
+        return
+    # Instances keep their loaded field values in __dict__, titles
+    # loaded without the rating fields are left alone.
+    rows = {
+        row["id"]: row
+        for row in (
+            title if isinstance(title, dict) else title.__dict__
+            for title in titles
+        )
+        if "score_sum" in row
+    }
+    if not rows:
+        return
+    pending = defaultdict(Counter)
+    deltas = (
+        ScoreDelta.objects.filter(title_id__in=rows)
+        .order_by()
+        .values_list("title_id", "score")
+        .annotate(total=Sum("delta"))
+    )
+    for title_id, score, total in deltas:
+        pending[title_id][score] += total
+    for title_id, changes in pending.items():
+        row = rows[title_id]
+        row["score_sum"] += sum(
+            score * delta for score, delta in changes.items()
+        )
+        row["reviews_count"] += sum(changes.values())
+        row["rating"] = None
+        if row["reviews_count"] > 0:
+            row["rating"] = row["score_sum"] // row["reviews_count"]
+        for score, delta in changes.items():
+            if histogram_field(score) in row:
+                row[histogram_field(score)] += delta
@@ -0,0 +1,61 @@
+from itertools import islice
+
+import numpy as np
+
+from .models import SCORES
+
+CHUNK_SIZE = 100_000
+
+
+def chunked(rows, size):
+    rows = iter(rows)
+    chunk = list(islice(rows, size))
+    while chunk:
+        yield chunk
+        chunk = list(islice(rows, size))
+
+
+def grow(array, size):
+    if len(array) >= size:
+        return array
+    return np.concatenate((array, np.zeros(size - len(array), array.dtype)))
+
+
+def aggregate_scores(rows, chunk_size=CHUNK_SIZE, histogram=False):
+    """Score sums and counts per title.
+    Takes an iterable of (title_id, score) pairs, reads it in chunks and
+    groups every chunk with bincount. The returned arrays are indexed
+    by title id. With histogram=True a third array holds the number of
+    reviews of every title (row) for every score (column)."""
+
+    width = max(SCORES) + 1
+    sums = np.zeros(0, np.int64)
+    counts = np.zeros(0, np.int64)
+    buckets = np.zeros(0, np.int64)
+    for chunk in chunked(rows, chunk_size):
+        title_ids, scores = np.array(chunk, np.int64).T
+        size = int(title_ids.max()) + 1
+        sums, counts = grow(sums, size), grow(counts, size)
+        sums[:size] += np.bincount(title_ids, scores).astype(np.int64)
+        counts[:size] += np.bincount(title_ids)
+        if histogram:
+            buckets = grow(buckets, size * width)
+            buckets[:size * width] += np.bincount(
+                title_ids * width + scores, minlength=size * width
+            )
+    if histogram:
+        buckets = grow(buckets, len(sums) * width)
+        return sums, counts, buckets.reshape(-1, width)
+    return sums, counts
+
+
+def weighted_ratings(sums, counts, min_votes):
+    """Bayesian (IMDb style) weighted rating of every title:
+    (v * R + m * C) / (v + m) = (sum + m * C) / (v + m),
+    where C is the mean score over all reviews and m is min_votes.
+    Titles without reviews get the prior C."""
+
+    if not counts.sum():
+        return np.zeros(0)
+    mean = sums.sum() / counts.sum()
+    return (sums + min_votes * mean) / (counts + min_votes)
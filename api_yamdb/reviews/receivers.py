@@ -0,0 +1,68 @@
+from django.db.models import Q
+from django.db.models.signals import (m2m_changed, post_save, pre_delete,
+                                      pre_save)
+from django.dispatch import receiver
+from users.models import User
+
+from .models import Category, Genre, Title, TitleRanking
+from .signals import rating_changed
+
+
+@receiver(rating_changed, sender=Title)
+def refresh_rating_rankings(sender, queryset, **kwargs):
+    TitleRanking.objects.refresh(queryset)
+
+
+@receiver(post_save, sender=Title)
+def refresh_title_rankings(sender, instance, created, **kwargs):
+    if not created:
+        TitleRanking.objects.refresh(Title.objects.filter(pk=instance.pk))
+
+
+@receiver(m2m_changed, sender=Title.genre.through)
+def refresh_genre_rankings(sender, instance, action, reverse, pk_set,
+                           **kwargs):
+    if action not in ("post_add", "post_remove", "post_clear"):
+        return
+    if not reverse:
+        titles = Title.objects.filter(pk=instance.pk)
+        titles.touch()
+        TitleRanking.objects.refresh(titles)
+    elif action == "post_clear":
+        TitleRanking.objects.filter(genre=instance).delete()
+    else:
+        titles = Title.objects.filter(pk__in=pk_set)
+        titles.touch()
+        TitleRanking.objects.refresh(titles)
+
+
+@receiver(post_save, sender=Genre)
+@receiver(pre_delete, sender=Genre)
+def touch_genre_titles(sender, instance, **kwargs):
+    Title.objects.filter(genre=instance).touch()
+
+
+@receiver(post_save, sender=Category)
+@receiver(pre_delete, sender=Category)
+def touch_category_titles(sender, instance, **kwargs):
+    Title.objects.filter(category=instance).touch()
+
+
+@receiver(pre_save, sender=User)
+def remember_rename(sender, instance, raw, **kwargs):
+    instance._renamed = not (raw or instance._state.adding) and (
+        User.objects.filter(pk=instance.pk)
+        .exclude(username=instance.username)
+        .exists()
+    )
+
+
+@receiver(post_save, sender=User)
+def touch_renamed_author_titles(sender, instance, **kwargs):
+    """Reviews and comments render the username of their author,
+    so a rename changes the ETag of the titles the user wrote under."""
+
+    if getattr(instance, "_renamed", False):
+        Title.objects.filter(
+            Q(reviews__author=instance) | Q(reviews__comments__author=instance)
+        ).touch()
@@ -0,0 +1,12 @@
+from django.dispatch import Signal
+
+# Sent after the stored rating of the titles in ``queryset`` has changed.
+rating_changed = Signal(providing_args=["queryset"])
+
+# Sent after review score changes of the titles in ``queryset`` were
+# recorded as ScoreDelta rows, before they are folded into the titles.
+scores_pending = Signal(providing_args=["queryset"])
+
+# Sent by import_csv inside its transaction, after rows were loaded in bulk
+# without the save and delete signals of the models.
+rows_imported = Signal()
@@ -1,5 +1,6 @@
 from django.contrib import admin
 from django.contrib.auth.admin import UserAdmin
+from reviews.models import Comment, Review
 
 from .models import User
 
@@ -48,5 +49,10 @@ class CustomUserAdmin(UserAdmin):
     search_fields = ("username", "first_name", "last_name", "email")
     ordering = ("role", "username")
 
+    def delete_queryset(self, request, queryset):
+        Comment.objects.filter(author__in=queryset).delete_with_counts()
+        Review.objects.filter(author__in=queryset).delete_with_ratings()
+        super().delete_queryset(request, queryset)
+
 
 admin.site.register(User, CustomUserAdmin)
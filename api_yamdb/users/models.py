@@ -12,6 +12,7 @@ class User(AbstractUser):
         (MODERATOR, "Moderator"),
         (ADMIN, "Administrator"),
     )
+    ADMIN_PERMISSIONS = ("add_user", "change_user")
 
     def get_secret_key():
         return get_random_secret_key()
@@ -58,11 +59,19 @@ class User(AbstractUser):
         super(User, self).save(*args, **kwargs)
         if self.role == self.ADMIN:
             save_user = User.objects.get(username=self.username)
-            needet_permission = ("add_user", "change_user")
-            for permission_code in needet_permission:
+            for permission_code in self.ADMIN_PERMISSIONS:
                 permission = Permission.objects.get(codename=permission_code)
                 save_user.user_permissions.add(permission)
 
+    def delete(self, *args, **kwargs):
+        """Removes the comments and the reviews of the user in bounded
+        batches first, so the comment counts of the commented reviews
+        and the ratings of the reviewed titles stay correct."""
+
+        self.comments.all().delete_with_counts()
+        self.reviews.all().delete_with_ratings()
+        return super().delete(*args, **kwargs)
+
     class Meta:
         verbose_name = "User"
         verbose_name_plural = "Users"
@@ -113,3 +113,25 @@ def create_comments(admin_client, admin):
     result.append({'id': create_comment(client_moderator, titles[0]["id"], reviews[0]["id"], 'qwerty321'),
                    'author': moderator.username, 'text': 'qwerty321'})
     return result, reviews, titles, user, moderator
+
+
+def create_catalogue(count):
+    from reviews.models import Category, Genre, Title
+
+    category = Category.objects.create(name='Films', slug='films')
+    genres = [
+        Genre.objects.create(name='Drama', slug='drama'),
+        Genre.objects.create(name='Comedy', slug='comedy'),
+    ]
+    for number in range(count):
+        title = Title.objects.create(
+            name=f'Title {number}', year=2000, category=category
+        )
+        title.genre.set(genres)
+
+
+def warm_slug_caches():
+    from api.cache import CATEGORY_SLUGS, GENRE_SLUGS
+
+    GENRE_SLUGS.by_slug()
+    CATEGORY_SLUGS.by_slug()
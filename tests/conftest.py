@@ -42,4 +42,5 @@ assert get_version() < '3.0.0', 'Please use the Django version < 3.0.0'
 
 pytest_plugins = [
     'tests.fixtures.fixture_user',
+    'tests.fixtures.fixture_cache',
 ]
@@ -0,0 +1,40 @@
+import pytest
+
+from .common import create_catalogue, warm_slug_caches
+
+
+class Test15QueriesAPI:
+
+    @pytest.mark.django_db(transaction=True)
+    @pytest.mark.parametrize('count', [1, 5])
+    def test_01_titles_list_queries(self, client, django_assert_num_queries, count):
+        create_catalogue(count)
+        warm_slug_caches()
+        # count, titles and genre ids; genres and categories are cached
+        with django_assert_num_queries(3):
+            response = client.get('/api/v1/titles/')
+        assert response.status_code == 200
+        assert len(response.json()['results']) == count, (
+            'Check that GET `/api/v1/titles/` returns every title of the page'
+        )
+        title = response.json()['results'][0]
+        assert title['category'] == {'name': 'Films', 'slug': 'films'}
+        assert len(title['genre']) == 2
+
+    @pytest.mark.django_db(transaction=True)
+    @pytest.mark.parametrize('page_size', [2, 10])
+    @pytest.mark.parametrize('query', ['', '?fields=id,genre,category'])
+    def test_02_page_size(self, client, django_assert_num_queries, monkeypatch, page_size, query):
+        from api.pagination import TitlePagination
+
+        create_catalogue(12)
+        warm_slug_caches()
+        monkeypatch.setattr(TitlePagination, 'page_size', page_size)
+        # the same three queries whatever the number of titles on the page
+        with django_assert_num_queries(3):
+            response = client.get(f'/api/v1/titles/{query}')
+        results = response.json()['results']
+        assert len(results) == page_size
+        assert all(len(title['genre']) == 2 and title['category'] for title in results), (
+            'Check that the genres and categories of every title of the page are returned'
+        )
@@ -0,0 +1,34 @@
+import pytest
+
+
+class Test16CursorPaginationAPI:
+
+    @pytest.mark.django_db(transaction=True)
+    def test_01_titles_cursor(self, client):
+        from reviews.models import Title
+
+        for number in range(7):
+            Title.objects.create(name=f'Title {number % 3}', year=2000 + number)
+        response = client.get('/api/v1/titles/?cursor=')
+        assert response.status_code == 200
+        data = response.json()
+        assert 'count' not in data, (
+            'Check that GET `/api/v1/titles/?cursor=` uses keyset pagination'
+        )
+        seen = [title['id'] for title in data['results']]
+        while data['next']:
+            data = client.get(data['next']).json()
+            seen += [title['id'] for title in data['results']]
+        expected = list(
+            Title.objects.order_by('name', 'year', 'id').values_list('id', flat=True)
+        )
+        assert seen == expected, (
+            'Check that cursor pages of `/api/v1/titles/` return every title once, in order'
+        )
+
+    @pytest.mark.django_db(transaction=True)
+    def test_02_titles_page_number(self, client):
+        response = client.get('/api/v1/titles/')
+        assert 'count' in response.json(), (
+            'Check that `/api/v1/titles/` keeps page number pagination by default'
+        )
@@ -0,0 +1,59 @@
+import pytest
+
+from .common import create_genre, create_titles
+
+
+class Test17ResponseCacheAPI:
+
+    @pytest.mark.django_db(transaction=True)
+    def test_01_genres_cached(self, client, admin_client, django_assert_num_queries):
+        create_genre(admin_client)
+        response = client.get('/api/v1/genres/')
+        assert response.status_code == 200
+        with django_assert_num_queries(0):
+            cached = client.get('/api/v1/genres/')
+        assert cached.json() == response.json(), (
+            'Check that anonymous GET `/api/v1/genres/` is served from the cache'
+        )
+        admin_client.post('/api/v1/genres/', data={'name': 'Western', 'slug': 'western'})
+        response = client.get('/api/v1/genres/')
+        assert response.json()['count'] == cached.json()['count'] + 1, (
+            'Check that creating a genre invalidates cached `/api/v1/genres/`'
+        )
+
+    @pytest.mark.django_db(transaction=True)
+    def test_02_title_rating_invalidates(self, client, admin_client):
+        titles, _, _ = create_titles(admin_client)
+        url = f'/api/v1/titles/{titles[0]["id"]}/'
+        assert client.get(url).json()['rating'] is None
+        admin_client.post(f'{url}reviews/', data={'text': 'Good', 'score': 8})
+        assert client.get(url).json()['rating'] == 8, (
+            'Check that a new review invalidates the cached title'
+        )
+
+    @pytest.mark.django_db(transaction=True)
+    def test_03_invalidated_on_commit(self, client):
+        from django.db import transaction
+
+        from api.cache import get_version
+        from reviews.models import Genre
+
+        client.get('/api/v1/genres/')
+        version = get_version('genres')
+        with transaction.atomic():
+            Genre.objects.create(name='Western', slug='western')
+            assert get_version('genres') == version, (
+                'Check that cached responses are not dropped before the write commits'
+            )
+        assert get_version('genres') != version, (
+            'Check that cached responses are dropped when the write commits'
+        )
+        assert client.get('/api/v1/genres/').json()['count'] == 1
+        version = get_version('genres')
+        try:
+            with transaction.atomic():
+                Genre.objects.create(name='Noir', slug='noir')
+                raise RuntimeError
+        except RuntimeError:
+            pass
+        assert get_version('genres') == version
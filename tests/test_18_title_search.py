@@ -0,0 +1,33 @@
+import pytest
+
+
+class Test18TitleSearchAPI:
+
+    @pytest.mark.django_db(transaction=True)
+    def test_01_search(self, client):
+        from reviews.models import Title
+
+        # Alphabetically the description match comes first.
+        Title.objects.create(name='Aurora', year=1990, description='A story about a dark night')
+        Title.objects.create(name='The dark tower', year=2008)
+        Title.objects.create(name='Sunny day', year=2010)
+        response = client.get('/api/v1/titles/?search=dark')
+        assert response.status_code == 200
+        names = [title['name'] for title in response.json()['results']]
+        assert names == ['The dark tower', 'Aurora'], (
+            'Check that GET `/api/v1/titles/?search=` returns matching titles, '
+            'best matches first'
+        )
+
+    @pytest.mark.django_db(transaction=True)
+    def test_02_search_with_cursor(self, client):
+        from reviews.models import Title
+
+        Title.objects.create(name='The dark tower', year=2008)
+        response = client.get('/api/v1/titles/?search=dark&cursor=')
+        assert response.status_code == 400, (
+            'Check that search results cannot be paginated with a cursor, '
+            'which would lose the rank ordering'
+        )
+        assert 'cursor' in response.json()
+        assert client.get('/api/v1/titles/?cursor=').status_code == 200
@@ -0,0 +1,46 @@
+import pytest
+
+
+def create_catalogue():
+    from reviews.models import Category, Genre, Title
+
+    films = Category.objects.create(name='Films', slug='films')
+    books = Category.objects.create(name='Books', slug='books')
+    drama = Genre.objects.create(name='Drama', slug='drama')
+    comedy = Genre.objects.create(name='Comedy', slug='comedy')
+    Genre.objects.create(name='Dramedy', slug='dramedy')
+    both = Title.objects.create(name='Both', year=2000, category=films)
+    both.genre.set([drama, comedy])
+    only_drama = Title.objects.create(name='Drama only', year=2001, category=books)
+    only_drama.genre.set([drama])
+    Title.objects.create(name='Nothing', year=2002)
+
+
+class Test19TitleFiltersAPI:
+
+    def names(self, client, query):
+        response = client.get(f'/api/v1/titles/?{query}')
+        assert response.status_code == 200
+        return [title['name'] for title in response.json()['results']]
+
+    @pytest.mark.django_db(transaction=True)
+    def test_01_genre(self, client):
+        create_catalogue()
+        assert self.names(client, 'genre=drama') == ['Both', 'Drama only']
+        assert self.names(client, 'genre=dram') == [], (
+            'Check that `genre` filters by the exact slug'
+        )
+        assert self.names(client, 'genre=drama,comedy') == ['Both', 'Drama only'], (
+            'Check that `genre` with several slugs returns each title once'
+        )
+        assert self.names(client, 'genre=drama,comedy&genre_match=all') == ['Both'], (
+            'Check that `genre_match=all` requires every genre'
+        )
+        assert self.names(client, 'genre=drama,unknown&genre_match=all') == []
+
+    @pytest.mark.django_db(transaction=True)
+    def test_02_category(self, client):
+        create_catalogue()
+        assert self.names(client, 'category=films') == ['Both']
+        assert self.names(client, 'category=films,books') == ['Both', 'Drama only']
+        assert self.names(client, 'category=film') == []
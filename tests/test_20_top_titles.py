@@ -0,0 +1,63 @@
+import pytest
+
+from .common import auth_client, create_titles, create_users_api
+
+
+class Test20TopTitlesAPI:
+
+    @pytest.mark.django_db(transaction=True)
+    def test_01_top(self, client, admin_client):
+        titles, categories, genres = create_titles(admin_client)
+        user, _ = create_users_api(admin_client)
+        response = client.get('/api/v1/titles/top/')
+        assert response.status_code == 200
+        assert response.json() == [], (
+            'Check that titles without reviews are not in `/api/v1/titles/top/`'
+        )
+        admin_client.post(f'/api/v1/titles/{titles[0]["id"]}/reviews/', data={'text': 'Ok', 'score': 8})
+        admin_client.post(f'/api/v1/titles/{titles[1]["id"]}/reviews/', data={'text': 'Wow', 'score': 9})
+        response = client.get('/api/v1/titles/top/')
+        assert [title['id'] for title in response.json()] == [titles[1]['id'], titles[0]['id']], (
+            'Check that `/api/v1/titles/top/` orders titles by rating'
+        )
+        assert response.json()[0]['rating'] == 9
+
+        auth_client(user).post(f'/api/v1/titles/{titles[0]["id"]}/reviews/', data={'text': 'Top', 'score': 10})
+        response = client.get('/api/v1/titles/top/?limit=1')
+        assert [title['id'] for title in response.json()] == [titles[0]['id']], (
+            'Check that `/api/v1/titles/top/` is refreshed when reviews change, '
+            'more reviews winning a tie'
+        )
+
+        response = client.get(f'/api/v1/titles/top/?genre={genres[2]["slug"]}')
+        assert [title['id'] for title in response.json()] == [titles[1]['id']]
+        response = client.get(f'/api/v1/titles/top/?category={categories[0]["slug"]}')
+        assert [title['id'] for title in response.json()] == [titles[0]['id']]
+        response = client.get('/api/v1/titles/top/?genre=unknown')
+        assert response.status_code == 404
+
+        admin_client.patch(f'/api/v1/titles/{titles[1]["id"]}/', data={'genre': [genres[0]['slug']]})
+        response = client.get(f'/api/v1/titles/top/?genre={genres[2]["slug"]}')
+        assert response.json() == [], (
+            'Check that the genre leaderboards follow title genre changes'
+        )
+
+    @pytest.mark.django_db(transaction=True)
+    def test_03_unique_rows(self, admin_client):
+        from django.db import IntegrityError, transaction
+
+        from reviews.models import Title, TitleRanking
+
+        titles, _, _ = create_titles(admin_client)
+        admin_client.post(f'/api/v1/titles/{titles[0]["id"]}/reviews/', data={'text': 'Ok', 'score': 8})
+        title = Title.objects.filter(pk=titles[0]['id'])
+        TitleRanking.objects.refresh(title)
+        TitleRanking.objects.refresh(title)
+        rows = list(TitleRanking.objects.filter(title__in=title).values_list('genre_id', 'category_id'))
+        assert len(rows) == len(set(rows)), 'Check that refreshing a title leaves one row per leaderboard'
+        for genre_id, category_id in rows:
+            with pytest.raises(IntegrityError), transaction.atomic():
+                TitleRanking.objects.create(
+                    title_id=titles[0]['id'], genre_id=genre_id, category_id=category_id,
+                    rating=8, reviews_count=1,
+                )
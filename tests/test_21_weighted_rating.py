@@ -0,0 +1,62 @@
+import pytest
+from django.core.management import call_command
+
+from .common import create_catalogue
+
+
+class Test21WeightedRatingAPI:
+
+    @pytest.mark.django_db(transaction=True)
+    def test_01_weighted_rating(self, client, django_user_model):
+        from reviews.models import Review, Title
+
+        users = [
+            django_user_model.objects.create_user(username=f'user{number}', email=f'user{number}@yamdb.fake')
+            for number in range(5)
+        ]
+        lucky = Title.objects.create(name='Lucky', year=2000)
+        solid = Title.objects.create(name='Solid', year=2000)
+        weak = Title.objects.create(name='Weak', year=2000)
+        unrated = Title.objects.create(name='Unrated', year=2000)
+        Review.objects.create(title=lucky, author=users[0], text='Wow', score=10)
+        Review.objects.create(title=weak, author=users[0], text='Bad', score=1)
+        for user in users[1:]:
+            Review.objects.create(title=solid, author=user, text='Good', score=9)
+
+        call_command('compute_weighted_ratings', '--min-votes=2', '--chunk-size=2')
+        # mean score C = 47 / 6
+        expected = {
+            lucky.id: round((10 + 2 * 47 / 6) / 3, 4),
+            solid.id: round((36 + 2 * 47 / 6) / 6, 4),
+            weak.id: round((1 + 2 * 47 / 6) / 3, 4),
+            unrated.id: round(47 / 6, 4),
+        }
+        assert dict(Title.objects.values_list('id', 'weighted_rating')) == expected
+
+        response = client.get('/api/v1/titles/?ordering=-weighted_rating')
+        names = [title['name'] for title in response.json()['results']]
+        assert names == ['Solid', 'Lucky', 'Unrated', 'Weak'], (
+            'Check that `/api/v1/titles/` can be ordered by `weighted_rating`'
+        )
+
+    @pytest.mark.django_db(transaction=True)
+    def test_02_ordering_with_cursor(self, client):
+        from reviews.models import Title
+
+        create_catalogue(7)
+        for title in Title.objects.order_by('pk')[:3]:
+            Title.objects.filter(pk=title.pk).update(rating=5, weighted_rating=5.0)
+        for ordering in ('-rating', '-weighted_rating'):
+            response = client.get(f'/api/v1/titles/?ordering={ordering}&cursor=')
+            assert response.status_code == 400, (
+                'Check that sorted titles are not keyset paginated, '
+                'nullable and duplicate keys would skip titles'
+            )
+            assert 'cursor' in response.json()
+        ids = []
+        url = '/api/v1/titles/?ordering=-rating'
+        while url:
+            data = client.get(url).json()
+            ids += [title['id'] for title in data['results']]
+            url = data['next']
+        assert sorted(ids) == sorted(Title.objects.values_list('pk', flat=True))
@@ -0,0 +1,33 @@
+import pytest
+
+from .common import auth_client, create_titles, create_users_api
+
+
+class Test22ScoreHistogramAPI:
+
+    def histogram(self, client, title_id):
+        response = client.get(f'/api/v1/titles/{title_id}/?histogram=true')
+        assert response.status_code == 200
+        return response.json()['score_histogram']
+
+    @pytest.mark.django_db(transaction=True)
+    def test_01_histogram(self, client, admin_client):
+        titles, _, _ = create_titles(admin_client)
+        user, _ = create_users_api(admin_client)
+        url = f'/api/v1/titles/{titles[0]["id"]}/'
+        assert 'score_histogram' not in client.get(url).json(), (
+            'Check that `score_histogram` is only returned on demand'
+        )
+        empty = {str(score): 0 for score in range(1, 11)}
+        assert self.histogram(client, titles[0]['id']) == empty
+
+        review = admin_client.post(f'{url}reviews/', data={'text': 'Ok', 'score': 7}).json()
+        auth_client(user).post(f'{url}reviews/', data={'text': 'Ok', 'score': 7})
+        assert self.histogram(client, titles[0]['id']) == {**empty, '7': 2}
+
+        admin_client.patch(f'{url}reviews/{review["id"]}/', data={'score': 3})
+        assert self.histogram(client, titles[0]['id']) == {**empty, '3': 1, '7': 1}, (
+            'Check that `score_histogram` follows review score changes'
+        )
+        admin_client.delete(f'{url}reviews/{review["id"]}/')
+        assert self.histogram(client, titles[0]['id']) == {**empty, '7': 1}
@@ -0,0 +1,67 @@
+import pytest
+from django.core.management import call_command
+
+from .common import create_reviews
+
+
+class Test23RecomputeRatings:
+
+    @pytest.mark.django_db(transaction=True)
+    def test_01_recompute_ratings(self, admin_client, admin, capsys):
+        from reviews.models import Review, Title
+
+        reviews, titles, _, _ = create_reviews(admin_client, admin)
+        call_command('recompute_ratings', '--chunk-size=2')
+        assert 'Found drift in 0 titles' in capsys.readouterr().out
+
+        Review.objects.filter(pk=reviews[0]['id']).delete()
+        Title.objects.filter(pk=titles[1]['id']).update(score_sum=50, reviews_count=5, rating=10)
+        call_command('recompute_ratings', '--dry-run')
+        assert 'Found drift in 2 titles' in capsys.readouterr().out
+        assert Title.objects.get(pk=titles[1]['id']).rating == 10, (
+            'Check that `recompute_ratings --dry-run` changes nothing'
+        )
+
+        call_command('recompute_ratings', '--chunk-size=2')
+        title = Title.objects.get(pk=titles[0]['id'])
+        assert (title.score_sum, title.reviews_count, title.rating) == (7, 2, 3)
+        assert title.score_histogram == {**{score: 0 for score in range(1, 11)}, 3: 1, 4: 1}
+        title = Title.objects.get(pk=titles[1]['id'])
+        assert (title.score_sum, title.reviews_count, title.rating) == (0, 0, None)
+        assert admin_client.get(f'/api/v1/titles/{titles[0]["id"]}/').json()['rating'] == 3
+
+    @pytest.mark.django_db(transaction=True)
+    def test_02_seeded_fixtures(self, client, tmp_path):
+        import json
+        import os
+
+        from django.conf import settings
+        from django.db.models import Avg, Count
+
+        from reviews.models import Review, Title, TitleRanking
+
+        # The content types and permissions of the dump are already
+        # created by the test database migrations.
+        with open(os.path.join(settings.BASE_DIR, 'fixtures', 'fixtures.json')) as file:
+            objects = [
+                item for item in json.load(file)
+                if item['model'] not in ('contenttypes.contenttype', 'auth.permission')
+            ]
+        for item in objects:
+            item['fields'].pop('user_permissions', None)
+        fixture = tmp_path / 'fixtures.json'
+        fixture.write_text(json.dumps(objects))
+        call_command('loaddata', str(fixture), verbosity=0)
+        # The deploy seeds with raw saves, which do not maintain the counters.
+        call_command('recompute_ratings', verbosity=0)
+        call_command('recompute_comment_counts', verbosity=0)
+        title = Title.objects.annotate(
+            average=Avg('reviews__score'), count=Count('reviews')
+        ).filter(count__gt=0).order_by('pk').first()
+        response = client.get(f'/api/v1/titles/{title.pk}/').json()
+        assert (response['rating'], response['reviews_count']) == (int(title.average), title.count), (
+            'Check that the seeded titles show the rating of their reviews'
+        )
+        review = Review.objects.filter(comments__isnull=False).first()
+        assert review.comments_count == review.comments.count()
+        assert TitleRanking.objects.filter(title=title, genre=None, category=None).exists()
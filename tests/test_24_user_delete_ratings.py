@@ -0,0 +1,58 @@
+import pytest
+
+from .common import auth_client, create_reviews
+
+
+class Test24UserDeleteRatingsAPI:
+
+    @pytest.mark.django_db(transaction=True)
+    def test_01_delete_user(self, admin_client, admin):
+        from reviews.models import Title
+
+        reviews, titles, user, _ = create_reviews(admin_client, admin)
+        auth_client(user).post(f'/api/v1/titles/{titles[1]["id"]}/reviews/', data={'text': 'Meh', 'score': 2})
+        response = admin_client.delete(f'/api/v1/users/{user.username}/')
+        assert response.status_code == 204
+        title = Title.objects.get(pk=titles[0]['id'])
+        assert (title.score_sum, title.reviews_count, title.rating) == (9, 2, 4), (
+            'Check that deleting a user updates the rating of the reviewed titles'
+        )
+        assert title.score_histogram[3] == 0
+        title = Title.objects.get(pk=titles[1]['id'])
+        assert (title.score_sum, title.reviews_count, title.rating) == (0, 0, None)
+
+    @pytest.mark.django_db(transaction=True)
+    def test_02_delete_with_ratings(self, admin_client, admin):
+        from reviews.models import Review, Title
+
+        reviews, titles, _, _ = create_reviews(admin_client, admin)
+        Review.objects.filter(pk=reviews[1]['id']).update(score=5)
+        Title.objects.filter(pk=titles[0]['id']).recompute_rating()
+        deleted = Review.objects.all().delete_with_ratings(batch_size=2)
+        assert deleted == 3
+        title = Title.objects.get(pk=titles[0]['id'])
+        assert (title.score_sum, title.reviews_count, title.rating) == (0, 0, None), (
+            'Check that several reviews of a title with the same score are all subtracted'
+        )
+        assert set(title.score_histogram.values()) == {0}
+
+    @pytest.mark.django_db(transaction=True)
+    def test_03_receivers_told_once(self, admin_client, admin):
+        from reviews.models import Review, Title
+        from reviews.signals import rating_changed
+
+        reviews, titles, _, _ = create_reviews(admin_client, admin)
+        sent = []
+
+        def receiver(sender, queryset, **kwargs):
+            sent.append(sorted(queryset.values_list('pk', flat=True)))
+
+        rating_changed.connect(receiver, sender=Title)
+        try:
+            deleted = Review.objects.all().delete_with_ratings(batch_size=1)
+        finally:
+            rating_changed.disconnect(receiver, sender=Title)
+        assert deleted == 3
+        assert sent == [[titles[0]['id']]], (
+            'Check that the rankings and caches are refreshed once after all the batches'
+        )
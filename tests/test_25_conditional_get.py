@@ -0,0 +1,108 @@
+import pytest
+
+from .common import create_titles
+
+
+class Test25ConditionalGetAPI:
+
+    @pytest.mark.django_db(transaction=True)
+    def test_01_title_and_reviews(self, client, admin_client, django_assert_num_queries):
+        titles, _, _ = create_titles(admin_client)
+        title_url = f'/api/v1/titles/{titles[0]["id"]}/'
+        reviews_url = f'{title_url}reviews/'
+        for url in (title_url, reviews_url):
+            response = client.get(url)
+            assert response.status_code == 200
+            etag = response['ETag']
+            assert response['Last-Modified']
+            with django_assert_num_queries(1):
+                response = client.get(url, HTTP_IF_NONE_MATCH=etag)
+            assert response.status_code == 304, (
+                f'Check that GET `{url}` with a matching `If-None-Match` returns 304'
+            )
+
+        etag = client.get(reviews_url)['ETag']
+        review = admin_client.post(reviews_url, data={'text': 'Nice', 'score': 7}).json()
+        response = client.get(reviews_url, HTTP_IF_NONE_MATCH=etag)
+        assert response.status_code == 200, (
+            'Check that a new review changes the ETag of the reviews'
+        )
+
+        comments_url = f'{reviews_url}{review["id"]}/comments/'
+        etag = client.get(comments_url)['ETag']
+        assert client.get(comments_url, HTTP_IF_NONE_MATCH=etag).status_code == 304
+        admin_client.post(comments_url, data={'text': 'Agree'})
+        response = client.get(comments_url, HTTP_IF_NONE_MATCH=etag)
+        assert response.status_code == 200, (
+            'Check that a new comment changes the ETag of the comments'
+        )
+        assert len(response.json()['results']) == 1
+
+    @pytest.mark.django_db(transaction=True)
+    def test_02_invalid_id(self, client):
+        response = client.get('/api/v1/titles/abc/')
+        assert response.status_code == 404, (
+            'Check that GET `/api/v1/titles/abc/` returns 404'
+        )
+
+    @pytest.mark.django_db(transaction=True)
+    def test_03_author_rename(self, client, admin_client, user_client, user):
+        titles, _, _ = create_titles(admin_client)
+        reviews_url = f'/api/v1/titles/{titles[0]["id"]}/reviews/'
+        user_client.post(reviews_url, data={'text': 'Nice', 'score': 7})
+        etag = client.get(reviews_url)['ETag']
+        user.first_name = 'Name'
+        user.save()
+        assert client.get(reviews_url, HTTP_IF_NONE_MATCH=etag).status_code == 304
+        user.username = 'renamed'
+        user.save()
+        response = client.get(reviews_url, HTTP_IF_NONE_MATCH=etag)
+        assert response.status_code == 200, (
+            'Check that renaming an author changes the ETag of their reviews'
+        )
+        assert response.json()['results'][0]['author'] == 'renamed'
+
+    @pytest.mark.django_db(transaction=True)
+    def test_04_relation_renames(self, client, admin_client):
+        from django.contrib import admin
+
+        from reviews.models import Category, Comment, Genre
+
+        titles, _, _ = create_titles(admin_client)
+        title_url = f'/api/v1/titles/{titles[0]["id"]}/'
+        for model, slug in ((Category, titles[0]['category']), (Genre, titles[0]['genre'][0])):
+            etag = client.get(title_url)['ETag']
+            obj = model.objects.get(slug=slug)
+            obj.name = f'Renamed {slug}'
+            obj.save()
+            response = client.get(title_url, HTTP_IF_NONE_MATCH=etag)
+            assert response.status_code == 200, (
+                f'Check that renaming a {model.__name__.lower()} changes the ETag of its titles'
+            )
+        review = admin_client.post(f'{title_url}reviews/', data={'text': 'Nice', 'score': 7}).json()
+        comments_url = f'{title_url}reviews/{review["id"]}/comments/'
+        admin_client.post(comments_url, data={'text': 'Agree'})
+        etag = client.get(comments_url)['ETag']
+        comment = Comment.objects.get()
+        comment.text = 'Edited'
+        admin.site._registry[Comment].save_model(None, comment, None, True)
+        response = client.get(comments_url, HTTP_IF_NONE_MATCH=etag)
+        assert response.status_code == 200, (
+            'Check that editing a comment in the admin changes the ETag of the comments'
+        )
+        assert response.json()['results'][0]['text'] == 'Edited'
+
+    @pytest.mark.django_db(transaction=True)
+    def test_05_commenter_deletion(self, client, admin_client, user_client, user):
+        titles, _, _ = create_titles(admin_client)
+        reviews_url = f'/api/v1/titles/{titles[0]["id"]}/reviews/'
+        review = admin_client.post(reviews_url, data={'text': 'Nice', 'score': 7}).json()
+        comments_url = f'{reviews_url}{review["id"]}/comments/'
+        user_client.post(comments_url, data={'text': 'Agree'})
+        etag = client.get(comments_url)['ETag']
+        user.delete()
+        response = client.get(comments_url, HTTP_IF_NONE_MATCH=etag)
+        assert response.status_code == 200, (
+            'Check that deleting a commenter changes the ETag of the comments'
+        )
+        assert response.json()['results'] == []
@@ -0,0 +1,36 @@
+import pytest
+
+from .common import create_catalogue, create_reviews
+
+
+class Test26SparseFieldsAPI:
+
+    @pytest.mark.django_db(transaction=True)
+    def test_01_titles_fields(self, client, django_assert_num_queries):
+        create_catalogue(3)
+        # count and titles, without the category join or the genre prefetch
+        with django_assert_num_queries(2):
+            response = client.get('/api/v1/titles/?fields=id,name,rating')
+        assert response.status_code == 200
+        for title in response.json()['results']:
+            assert set(title) == {'id', 'name', 'rating'}, (
+                'Check that `?fields=` trims the fields of `/api/v1/titles/`'
+            )
+        response = client.get('/api/v1/titles/?fields=name,genre,score_histogram')
+        title = response.json()['results'][0]
+        assert set(title) == {'name', 'genre', 'score_histogram'}
+        assert len(title['genre']) == 2
+        response = client.get('/api/v1/titles/?fields=unknown')
+        assert 'description' in response.json()['results'][0], (
+            'Check that unknown `?fields=` names are ignored'
+        )
+
+    @pytest.mark.django_db(transaction=True)
+    def test_02_reviews_users_fields(self, admin_client, admin):
+        reviews, titles, user, _ = create_reviews(admin_client, admin)
+        response = admin_client.get(f'/api/v1/titles/{titles[0]["id"]}/reviews/?fields=id,score')
+        assert [set(review) for review in response.json()['results']] == [{'id', 'score'}] * 3
+        response = admin_client.get(f'/api/v1/users/{user.username}/?fields=username,role')
+        assert response.json() == {'username': user.username, 'role': 'user'}
+        response = admin_client.get('/api/v1/users/?fields=username')
+        assert set(response.json()['results'][0]) == {'username'}
@@ -0,0 +1,37 @@
+import pytest
+
+from .common import create_catalogue, warm_slug_caches
+
+ALL_FIELDS = 'id,name,year,rating,reviews_count,description,genre,category'
+
+
+class Test27TitleValuesListAPI:
+
+    @pytest.mark.django_db(transaction=True)
+    def test_01_same_output(self, admin_client):
+        from reviews.models import Title
+
+        create_catalogue(3)
+        Title.objects.filter(name='Title 1').update(rating=7, description='Text')
+        Title.objects.create(name='No category', year=1990)
+        for query in ('', '?ordering=-rating', '?genre=drama', '?search=Title'):
+            fast = admin_client.get(f'/api/v1/titles/{query}')
+            sep = '&' if query else '?'
+            full = admin_client.get(f'/api/v1/titles/{query}{sep}fields={ALL_FIELDS}')
+            assert fast.status_code == 200
+            assert fast.content == full.content, (
+                'Check that the values() list of `/api/v1/titles/` renders '
+                'the same output as the serializer'
+            )
+
+    @pytest.mark.django_db(transaction=True)
+    def test_02_queries(self, client, django_assert_num_queries):
+        create_catalogue(5)
+        warm_slug_caches()
+        # count, values rows and the genre ids of the page
+        with django_assert_num_queries(3):
+            response = client.get('/api/v1/titles/')
+        assert len(response.json()['results'][0]['genre']) == 2
+        with django_assert_num_queries(2):
+            response = client.get('/api/v1/titles/?cursor=')
+        assert response.status_code == 200
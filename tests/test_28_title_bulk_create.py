@@ -0,0 +1,77 @@
+import json
+
+import pytest
+
+from .common import create_catalogue
+
+
+class Test28TitleBulkCreateAPI:
+
+    @pytest.mark.django_db(transaction=True)
+    def test_01_bulk_create(self, admin_client, django_assert_num_queries):
+        from django.db import connection
+
+        from reviews.models import Title
+
+        create_catalogue(0)
+        data = [
+            {'name': f'Bulk {number}', 'year': 2001, 'genre': ['drama', 'comedy'],
+             'category': 'films', 'description': 'Text'}
+            for number in range(20)
+        ]
+        data[0]['genre'] = ['drama', 'drama']
+        # user, genres and categories, the genre links and their prefetch;
+        # PostgreSQL inserts the titles and their search vectors in bulk,
+        # SQLite opens the transaction and saves and touches every title
+        if connection.features.can_return_ids_from_bulk_insert:
+            expected = 5 + 2
+        else:
+            expected = 5 + 1 + 2 * len(data)
+        with django_assert_num_queries(expected):
+            response = admin_client.post('/api/v1/titles/bulk/', data=json.dumps(data), content_type='application/json')
+        assert response.status_code == 201, (
+            'Check that a POST request to `/api/v1/titles/bulk/` returns status 201'
+        )
+        result = response.json()
+        assert [title['name'] for title in result] == [item['name'] for item in data]
+        assert result[0]['genre'] == ['drama']
+        assert sorted(result[1]['genre']) == ['comedy', 'drama']
+        assert result[1]['category'] == 'films'
+        assert Title.objects.filter(name__startswith='Bulk').count() == 20
+        assert Title.genre.through.objects.filter(title_id=result[1]['id']).count() == 2
+        response = admin_client.get('/api/v1/titles/?genre=comedy')
+        assert response.json()['count'] == 19
+
+    @pytest.mark.django_db(transaction=True)
+    def test_02_bulk_errors(self, admin_client, user_client, client):
+        from reviews.models import Title
+
+        create_catalogue(0)
+        data = [
+            {'name': 'Good', 'year': 2001, 'genre': ['drama'], 'category': 'films'},
+            {'name': 'Bad genre', 'year': 2001, 'genre': ['unknown'], 'category': 'films'},
+            {'name': 'Bad category', 'year': 2001, 'genre': ['drama'], 'category': ['films']},
+            'not an object',
+        ]
+        response = admin_client.post('/api/v1/titles/bulk/', data=json.dumps(data), content_type='application/json')
+        assert response.status_code == 400
+        errors = response.json()
+        assert len(errors) == 4, 'Check that the errors are reported per item'
+        assert errors[0] == {}
+        assert 'genre' in errors[1]
+        assert 'category' in errors[2]
+        assert 'non_field_errors' in errors[3]
+        assert not Title.objects.exists(), 'Check that nothing is created when an item is invalid'
+        response = admin_client.post('/api/v1/titles/bulk/', data=json.dumps(data[0]), content_type='application/json')
+        assert response.status_code == 400
+        for forbidden in (user_client, client):
+            response = forbidden.post('/api/v1/titles/bulk/', data=json.dumps(data[:1]), content_type='application/json')
+            assert response.status_code in (401, 403)
+
+    @pytest.mark.django_db(transaction=True)
+    def test_03_bulk_invalidates_cache(self, admin_client, client):
+        create_catalogue(1)
+        assert client.get('/api/v1/titles/').json()['count'] == 1
+        data = [{'name': 'New', 'year': 2001, 'genre': ['drama'], 'category': 'films'}]
+        admin_client.post('/api/v1/titles/bulk/', data=json.dumps(data), content_type='application/json')
+        assert client.get('/api/v1/titles/').json()['count'] == 2
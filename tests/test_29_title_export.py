@@ -0,0 +1,66 @@
+import csv
+import io
+import json
+
+import pytest
+
+from .common import create_catalogue, warm_slug_caches
+
+
+class Test29TitleExportAPI:
+
+    @pytest.mark.django_db(transaction=True)
+    def test_01_ndjson(self, admin_client):
+        from reviews.models import Title
+
+        create_catalogue(7)
+        Title.objects.create(name='No category', year=1990)
+        response = admin_client.get('/api/v1/titles/export/')
+        assert response.status_code == 200, (
+            'Check that an admin GET request to `/api/v1/titles/export/` returns status 200'
+        )
+        assert response.streaming
+        assert response['Content-Type'] == 'application/x-ndjson'
+        lines = b''.join(response.streaming_content).decode().splitlines()
+        titles = [json.loads(line) for line in lines]
+        assert [title['id'] for title in titles] == list(
+            Title.objects.order_by('id').values_list('id', flat=True)
+        )
+        listed = admin_client.get('/api/v1/titles/?fields=id,name,year,rating,reviews_count,description,genre,category')
+        listed = listed.json()['results'][0]
+        assert next(title for title in titles if title['id'] == listed['id']) == listed
+        assert titles[-1]['category'] is None
+
+    @pytest.mark.django_db(transaction=True)
+    def test_02_csv(self, admin_client):
+        create_catalogue(3)
+        response = admin_client.get('/api/v1/titles/export/?file_format=csv')
+        assert response['Content-Type'] == 'text/csv'
+        assert 'titles.csv' in response['Content-Disposition']
+        content = b''.join(response.streaming_content).decode()
+        rows = list(csv.DictReader(io.StringIO(content)))
+        assert len(rows) == 3
+        assert rows[0]['category'] == 'films'
+        assert sorted(rows[0]['genre'].split(',')) == ['comedy', 'drama']
+        response = admin_client.get('/api/v1/titles/export/?file_format=xml')
+        assert response.status_code == 400
+
+    @pytest.mark.django_db(transaction=True)
+    def test_03_admin_only(self, user_client, client):
+        assert user_client.get('/api/v1/titles/export/').status_code == 403
+        assert client.get('/api/v1/titles/export/').status_code == 401
+
+    @pytest.mark.django_db(transaction=True)
+    def test_04_chunks(self, django_assert_num_queries):
+        from api.export import export_rows
+        from api.serializers import TITLE_VALUES
+        from reviews.models import Title
+
+        create_catalogue(5)
+        warm_slug_caches()
+        values = Title.objects.order_by('id').values(*TITLE_VALUES)
+        # titles and the genres of each of the three chunks
+        with django_assert_num_queries(4):
+            rows = list(export_rows(values, chunk_size=2))
+        assert len(rows) == 5
+        assert all(len(row['genre']) == 2 for row in rows)
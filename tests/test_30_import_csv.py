@@ -0,0 +1,97 @@
+import pytest
+from django.core.management import call_command
+
+FILES = {
+    'users.csv': (
+        'id,username,email,role,bio,first_name,last_name\n'
+        '100,bingobongo,bingobongo@yamdb.fake,user,,,\n'
+        '101,chief,chief@yamdb.fake,admin,Boss,,\n'
+    ),
+    'category.csv': 'id,name,slug\n1,Фильм,movie\n2,Книга,book\n',
+    'genre.csv': 'id,name,slug\n1,Драма,drama\n2,Комедия,comedy\n',
+    'titles.csv': (
+        'id,name,year,category\n'
+        '1,"Побег из Шоушенка",1994,1\n'
+        '2,"Крёстный отец",1972,1\n'
+        '3,"Без категории",1990,\n'
+    ),
+    'genre_title.csv': 'id,title_id,genre_id\n1,1,1\n2,2,1\n3,2,2\n',
+    'review.csv': (
+        'id,title_id,text,author,score,pub_date\n'
+        '1,1,"Ставлю ""десять""",100,10,2019-09-24T21:08:21.567Z\n'
+        '2,1,Хорошо,101,5,2019-09-25T21:08:21.567Z\n'
+        '3,2,Неплохо,100,7,2019-09-26T21:08:21.567Z\n'
+        '4,99,Нет такого произведения,100,7,2019-09-26T21:08:21.567Z\n'
+    ),
+    'comments.csv': 'id,review_id,text,author,pub_date\n1,1,Согласен,101,2019-09-27T21:08:21.567Z\n',
+}
+
+
+class Test30ImportCSV:
+
+    @pytest.mark.django_db(transaction=True)
+    def test_01_import(self, tmp_path, capsys, client):
+        from reviews.models import Comment, Review, Title
+        from users.models import User
+
+        for name, content in FILES.items():
+            (tmp_path / name).write_text(content, encoding='utf-8')
+        call_command('import_csv', str(tmp_path), '--batch-size=2')
+        out = capsys.readouterr().out
+        assert 'Imported 3 of 4 rows into reviews_review' in out, (
+            'Check that rows pointing to missing rows are skipped'
+        )
+        assert User.objects.count() == 2
+        chief = User.objects.get(username='chief')
+        assert chief.is_staff and chief.has_perm('users.change_user'), (
+            'Check that imported admins get the permissions of User.save'
+        )
+        assert Title.objects.get(pk=3).category is None
+        assert sorted(Title.objects.get(pk=2).genre.values_list('slug', flat=True)) == ['comedy', 'drama']
+        review = Review.objects.get(pk=1)
+        assert review.text == 'Ставлю "десять"'
+        assert review.pub_date.year == 2019, 'Check that publication dates are kept'
+        assert Comment.objects.get().pub_date.day == 27
+        title = Title.objects.get(pk=1)
+        assert (title.score_sum, title.reviews_count, title.rating) == (15, 2, 7), (
+            'Check that ratings are recomputed after the import'
+        )
+        assert title.weighted_rating is not None
+        assert client.get('/api/v1/titles/1/').json()['rating'] == 7
+        Title.objects.create(name='After import', year=2000)
+
+    @pytest.mark.django_db(transaction=True)
+    def test_02_copy_value(self):
+        from reviews.management.commands.import_csv import copy_value
+
+        assert copy_value(None) == r'\N'
+        assert copy_value('') == '""'
+        assert copy_value('say "hi"') == '"say ""hi"""'
+
+    @pytest.mark.django_db(transaction=True)
+    def test_03_caches_and_published_lists(self, tmp_path, client, settings):
+        from api.cache import GENRE_SLUGS
+
+        settings.PUBLISHED_LISTS_ROOT = str(tmp_path / 'published')
+        settings.PUBLISHED_LISTS_URL = 'http://testserver'
+        assert client.get('/api/v1/genres/').json()['results'] == []
+        assert client.get('/api/v1/titles/').json()['results'] == []
+        assert GENRE_SLUGS.by_slug() == {}
+        data = tmp_path / 'data'
+        data.mkdir()
+        for name in ('category.csv', 'genre.csv', 'titles.csv', 'genre_title.csv'):
+            (data / name).write_text(FILES[name], encoding='utf-8')
+        call_command('import_csv', str(data))
+        response = client.get('/api/v1/genres/')
+        assert response.json()['count'] == 2, (
+            'Check that the import drops the cached responses'
+        )
+        assert client.get('/api/v1/titles/').json()['count'] == 3
+        assert sorted(GENRE_SLUGS.by_slug()) == ['comedy', 'drama'], (
+            'Check that the import drops the cached genre slugs'
+        )
+        published = tmp_path / 'published' / 'genres' / 'page-1.json'
+        assert published.read_bytes() == response.content, (
+            'Check that the import publishes the genre list'
+        )
+        assert b'movie' in (tmp_path / 'published' / 'categories' / 'page-1.json').read_bytes()
@@ -0,0 +1,84 @@
+import pytest
+
+from .common import create_catalogue, warm_slug_caches
+
+
+class Test31SlugCache:
+
+    @pytest.mark.django_db(transaction=True)
+    def test_01_serializer_lookups(self, django_assert_num_queries):
+        from api.serializers import TitleSerializer
+        from reviews.models import Genre
+
+        create_catalogue(0)
+        warm_slug_caches()
+        data = {'name': 'Cached', 'year': 2000, 'genre': ['drama', 'comedy'], 'category': 'films'}
+        with django_assert_num_queries(0):
+            serializer = TitleSerializer(data=data)
+            assert serializer.is_valid(), serializer.errors
+        # rows written without signals are found in the database
+        Genre.objects.bulk_create([Genre(name='Silent', slug='silent')])
+        serializer = TitleSerializer(data={**data, 'genre': ['silent']})
+        assert serializer.is_valid(), serializer.errors
+        serializer = TitleSerializer(data={**data, 'genre': ['unknown']})
+        assert not serializer.is_valid()
+
+    @pytest.mark.django_db(transaction=True)
+    def test_02_invalidation(self, admin_client, client):
+        from reviews.models import Category
+
+        create_catalogue(1)
+        warm_slug_caches()
+        response = admin_client.post('/api/v1/genres/', data={'name': 'Noir', 'slug': 'noir'})
+        assert response.status_code == 201
+        response = admin_client.post('/api/v1/titles/', data={
+            'name': 'New', 'year': 2000, 'genre': ['noir'], 'category': 'films'
+        })
+        assert response.status_code == 201
+        category = Category.objects.get(slug='films')
+        category.name = 'Movies'
+        category.save()
+        title = client.get('/api/v1/titles/?genre=noir').json()['results'][0]
+        assert title['genre'] == [{'name': 'Noir', 'slug': 'noir'}]
+        assert title['category'] == {'name': 'Movies', 'slug': 'films'}, (
+            'Check that category changes reach the cached title representation'
+        )
+        response = client.get(f'/api/v1/titles/{title["id"]}/')
+        assert response.json()['category']['name'] == 'Movies'
+
+    @pytest.mark.django_db(transaction=True)
+    def test_03_deleted_relations(self):
+        from api.cache import CATEGORY_SLUGS, GENRE_SLUGS
+        from api.serializers import ReadOnlyTitleSerializer, title_rows
+        from reviews.models import Title
+
+        create_catalogue(1)
+        warm_slug_caches()
+        title = Title.objects.get()
+        assert GENRE_SLUGS.get(0) is None and CATEGORY_SLUGS.get(0) is None, (
+            'Check that a missing primary key is not an error'
+        )
+        row = {**Title.objects.values(
+            'id', 'name', 'year', 'rating', 'reviews_count', 'description'
+        ).get(), 'category_id': 0}
+        assert title_rows([row])[0]['category'] is None, (
+            'Check that a category deleted since the rows were read is rendered as null'
+        )
+        title.category_id = 0
+        assert ReadOnlyTitleSerializer(title).data['category'] is None
+
+    @pytest.mark.django_db(transaction=True)
+    def test_04_filter_slugs_written_without_signals(self, client):
+        from reviews.models import Genre, Title
+
+        create_catalogue(2)
+        warm_slug_caches()
+        Genre.objects.bulk_create([Genre(name='Western', slug='western')])
+        title = Title.objects.order_by('name').first()
+        title.genre.through.objects.create(title=title, genre=Genre.objects.get(slug='western'))
+        response = client.get('/api/v1/titles/?genre=western')
+        assert response.json()['count'] == 1, (
+            'Check that the genre filter finds genres missing from the slug cache'
+        )
+        response = client.get('/api/v1/titles/?genre=western,drama&genre_match=all')
+        assert response.json()['count'] == 1
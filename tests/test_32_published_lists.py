@@ -0,0 +1,51 @@
+import pytest
+from django.core.management import CommandError, call_command
+
+
+class Test32PublishedLists:
+
+    @pytest.mark.django_db(transaction=True)
+    def test_01_published_pages(self, admin_client, client, settings, tmp_path):
+        settings.PUBLISHED_LISTS_ROOT = str(tmp_path)
+        settings.PUBLISHED_LISTS_URL = 'http://testserver'
+        for number in range(6):
+            response = admin_client.post('/api/v1/genres/', data={'name': f'Genre {number}', 'slug': f'genre-{number}'})
+            assert response.status_code == 201
+        directory = tmp_path / 'genres'
+        assert sorted(path.name for path in directory.iterdir()) == ['page-1.json', 'page-2.json'], (
+            'Check that every genre write publishes the pages of the list'
+        )
+        assert (directory / 'page-1.json').read_bytes() == client.get('/api/v1/genres/').content
+        assert (directory / 'page-2.json').read_bytes() == client.get('/api/v1/genres/?page=2').content
+        response = admin_client.delete('/api/v1/genres/genre-5/')
+        assert response.status_code == 204
+        assert sorted(path.name for path in directory.iterdir()) == ['page-1.json'], (
+            'Check that pages past the end of the list are removed'
+        )
+        admin_client.post('/api/v1/categories/', data={'name': 'Films', 'slug': 'films'})
+        assert b'films' in (tmp_path / 'categories' / 'page-1.json').read_bytes()
+
+    @pytest.mark.django_db(transaction=True)
+    def test_02_disabled_and_command(self, admin_client, settings, tmp_path):
+        settings.PUBLISHED_LISTS_ROOT = None
+        admin_client.post('/api/v1/genres/', data={'name': 'Drama', 'slug': 'drama'})
+        assert not list(tmp_path.iterdir())
+        with pytest.raises(CommandError):
+            call_command('publish_lists')
+        settings.PUBLISHED_LISTS_ROOT = str(tmp_path)
+        settings.PUBLISHED_LISTS_URL = 'http://testserver'
+        call_command('publish_lists')
+        assert (tmp_path / 'genres' / 'page-1.json').exists()
+        assert (tmp_path / 'categories' / 'page-1.json').exists()
+
+    @pytest.mark.django_db(transaction=True)
+    def test_03_missing_url(self, admin_client, settings, tmp_path, caplog):
+        settings.PUBLISHED_LISTS_ROOT = str(tmp_path)
+        settings.PUBLISHED_LISTS_URL = None
+        admin_client.post('/api/v1/genres/', data={'name': 'Drama', 'slug': 'drama'})
+        assert not list(tmp_path.iterdir()), (
+            'Check that no pages with links to a guessed host are published'
+        )
+        assert 'PUBLISHED_LISTS_URL is not set' in caplog.text
+        with pytest.raises(CommandError, match='PUBLISHED_LISTS_URL'):
+            call_command('publish_lists')
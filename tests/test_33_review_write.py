@@ -0,0 +1,88 @@
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+from .common import auth_client, create_catalogue
+
+
+def create_authors(django_user_model, count):
+    return [
+        django_user_model.objects.create_user(username=f'author{number}', email=f'author{number}@yamdb.fake')
+        for number in range(count)
+    ]
+
+
+class Test33ReviewWrite:
+
+    @pytest.mark.django_db(transaction=True)
+    def test_01_create_statements(self, django_user_model):
+        from reviews.models import Review, Title
+
+        create_catalogue(2)
+        busy, quiet = Title.objects.order_by('name')
+        authors = create_authors(django_user_model, 6)
+        for author in authors[:4]:
+            Review.objects.create(title=busy, author=author, text='text', score=5)
+        counts = []
+        for title, author in ((quiet, authors[4]), (busy, authors[5])):
+            client = auth_client(author)
+            with CaptureQueriesContext(connection) as queries:
+                response = client.post(f'/api/v1/titles/{title.pk}/reviews/', data={'text': 'text', 'score': 8})
+            assert response.status_code == 201
+            counts.append(len(queries))
+        assert counts[0] == counts[1], (
+            'Check that posting a review costs the same statements however many reviews the title has'
+        )
+
+    @pytest.mark.django_db(transaction=True)
+    def test_02_duplicate_and_missing_title(self, user_client, user):
+        from api.messages import MESSAGES
+        from reviews.models import Review, Title
+
+        create_catalogue(1)
+        title = Title.objects.get()
+        url = f'/api/v1/titles/{title.pk}/reviews/'
+        assert user_client.post(url, data={'text': 'text', 'score': 8}).status_code == 201
+        response = user_client.post(url, data={'text': 'again', 'score': 2})
+        assert response.status_code == 400
+        assert response.json() == [MESSAGES['duplication_review']]
+        title = Title.objects.get()
+        assert (title.score_sum, title.reviews_count, title.rating) == (8, 1, 8), (
+            'Check that a rejected duplicate review does not change the rating'
+        )
+        response = user_client.post(f'/api/v1/titles/{title.pk + 1}/reviews/', data={'text': 'text', 'score': 8})
+        assert response.status_code == 404
+        assert Review.objects.count() == 1
+
+    @pytest.mark.django_db(transaction=True)
+    def test_03_concurrent_delete(self, user):
+        from api.views import ReviewViewSet
+        from reviews.models import Review, Title
+
+        create_catalogue(1)
+        title = Title.objects.get()
+        Title.objects.filter(pk=title.pk).update_rating(new_score=6)
+        review = Review.objects.create(title=title, author=user, text='text', score=6)
+        stale = Review.objects.get(pk=review.pk)
+        ReviewViewSet().perform_destroy(review)
+        ReviewViewSet().perform_destroy(stale)
+        title = Title.objects.get()
+        assert (title.score_sum, title.reviews_count) == (0, 0), (
+            'Check that a review deleted twice is removed from the rating once'
+        )
+
+    @pytest.mark.django_db(transaction=True)
+    def test_04_title_edit_keeps_rating(self, admin_client, django_user_model):
+        from reviews.models import Title
+
+        create_catalogue(1)
+        title = Title.objects.get()
+        author = create_authors(django_user_model, 1)[0]
+        response = auth_client(author).post(f'/api/v1/titles/{title.pk}/reviews/', data={'text': 'text', 'score': 8})
+        assert response.status_code == 201
+        title.name = 'Renamed'
+        title.save()
+        title = Title.objects.get()
+        assert (title.name, title.score_sum, title.reviews_count, title.rating) == ('Renamed', 8, 1, 8), (
+            'Check that saving a stale title does not overwrite its rating counters'
+        )
@@ -0,0 +1,144 @@
+import pytest
+from django.core.management import call_command
+
+from .common import auth_client, create_catalogue
+
+
+def post_reviews(django_user_model, title, scores):
+    reviews = []
+    for number, score in enumerate(scores):
+        author = django_user_model.objects.create_user(
+            username=f'critic{number}', email=f'critic{number}@yamdb.fake'
+        )
+        client = auth_client(author)
+        response = client.post(f'/api/v1/titles/{title.pk}/reviews/', data={'text': 'text', 'score': score})
+        assert response.status_code == 201
+        reviews.append((client, response.json()['id']))
+    return reviews
+
+
+class Test34ScoreDeltas:
+
+    @pytest.mark.django_db(transaction=True)
+    def test_01_deltas_summed_on_read(self, client, django_user_model, settings):
+        from reviews.models import ScoreDelta, Title
+
+        settings.RATING_DELTAS = True
+        create_catalogue(1)
+        title = Title.objects.get()
+        reviews = post_reviews(django_user_model, title, [4, 8, 9])
+        stored = Title.objects.get()
+        assert (stored.score_sum, stored.reviews_count, stored.version) == (0, 0, title.version), (
+            'Check that reviews do not write the title row with RATING_DELTAS on'
+        )
+        assert ScoreDelta.objects.count() == 3
+        assert client.get(f'/api/v1/titles/{title.pk}/').json()['rating'] == 7
+        assert client.get('/api/v1/titles/').json()['results'][0]['rating'] == 7
+        assert client.get('/api/v1/titles/?fields=id,rating').json()['results'][0]['rating'] == 7
+        histogram = client.get(f'/api/v1/titles/{title.pk}/?histogram=1').json()['score_histogram']
+        assert (histogram['4'], histogram['8'], histogram['9']) == (1, 1, 1)
+
+        review_client, review_id = reviews[0]
+        url = f'/api/v1/titles/{title.pk}/reviews/{review_id}/'
+        assert review_client.patch(url, data={'score': 10}).status_code == 200
+        review_client, review_id = reviews[1]
+        url = f'/api/v1/titles/{title.pk}/reviews/{review_id}/'
+        assert review_client.delete(url).status_code == 204
+        assert client.get(f'/api/v1/titles/{title.pk}/').json()['rating'] == 9
+
+        call_command('fold_score_deltas')
+        assert not ScoreDelta.objects.exists()
+        stored = Title.objects.get()
+        assert (stored.score_sum, stored.reviews_count, stored.rating) == (19, 2, 9), (
+            'Check that fold_score_deltas applies the deltas to the title'
+        )
+        assert stored.score_histogram[10] == 1 and stored.score_histogram[4] == 0
+        assert client.get(f'/api/v1/titles/{title.pk}/').json()['rating'] == 9
+        assert [item['id'] for item in client.get('/api/v1/titles/top/').json()] == [title.pk]
+
+    @pytest.mark.django_db(transaction=True)
+    def test_02_conditional_get(self, client, django_user_model, settings):
+        from reviews.models import Title
+
+        settings.RATING_DELTAS = True
+        create_catalogue(1)
+        title = Title.objects.get()
+        etag = client.get(f'/api/v1/titles/{title.pk}/')['ETag']
+        post_reviews(django_user_model, title, [6])
+        response = client.get(f'/api/v1/titles/{title.pk}/', HTTP_IF_NONE_MATCH=etag)
+        assert response.status_code == 200, (
+            'Check that pending score deltas change the ETag of the title'
+        )
+        assert response.json()['rating'] == 6
+
+    @pytest.mark.django_db(transaction=True)
+    def test_03_recompute_drops_deltas(self, client, django_user_model, settings):
+        from reviews.models import ScoreDelta, Title
+
+        settings.RATING_DELTAS = True
+        create_catalogue(1)
+        title = Title.objects.get()
+        post_reviews(django_user_model, title, [3, 5])
+        Title.objects.all().recompute_rating()
+        assert not ScoreDelta.objects.exists()
+        stored = Title.objects.get()
+        assert (stored.score_sum, stored.reviews_count, stored.rating) == (8, 2, 4)
+        assert client.get(f'/api/v1/titles/{title.pk}/').json()['rating'] == 4
+
+    @pytest.mark.django_db(transaction=True)
+    def test_04_sparse_fields(self, client, django_user_model, settings, django_assert_max_num_queries):
+        from reviews.models import Title
+
+        settings.RATING_DELTAS = True
+        create_catalogue(1)
+        post_reviews(django_user_model, Title.objects.get(), [7])
+        with django_assert_max_num_queries(2):
+            response = client.get('/api/v1/titles/?fields=id,name')
+        assert response.json()['results'][0] == {'id': Title.objects.get().pk, 'name': 'Title 0'}
+
+    @pytest.mark.django_db(transaction=True)
+    def test_05_drift_with_pending_deltas(self, django_user_model, settings, capsys):
+        from reviews.models import ScoreDelta, Title
+
+        settings.RATING_DELTAS = True
+        create_catalogue(2)
+        title = Title.objects.order_by('name').first()
+        post_reviews(django_user_model, title, [3, 5])
+        call_command('recompute_ratings', '--dry-run')
+        assert 'Found drift in 0 titles' in capsys.readouterr().out, (
+            'Check that pending score deltas are not reported as drift'
+        )
+        assert ScoreDelta.objects.count() == 2
+        Title.objects.filter(pk=title.pk).update(score_sum=50)
+        call_command('recompute_ratings')
+        assert 'Found drift in 1 titles' in capsys.readouterr().out
+        stored = Title.objects.get(pk=title.pk)
+        assert (stored.score_sum, stored.reviews_count, stored.rating) == (8, 2, 4)
+        assert not ScoreDelta.objects.exists()
+
+    @pytest.mark.django_db(transaction=True)
+    def test_06_recompute_keeps_later_deltas(self, django_user_model, settings, monkeypatch):
+        from reviews.models import Review, ScoreDelta, ScoreDeltaQuerySet, Title
+
+        settings.RATING_DELTAS = True
+        create_catalogue(1)
+        title = Title.objects.get()
+        post_reviews(django_user_model, title, [3])
+        delete = ScoreDeltaQuerySet.delete
+
+        def commit_late_review(queryset):
+            # A delta-mode review committed after the reviews were aggregated.
+            author = django_user_model.objects.create_user(username='late', email='late@yamdb.fake')
+            Review.objects.create(title=title, author=author, text='text', score=9)
+            ScoreDelta.objects.create(title=title, score=9, delta=1)
+            monkeypatch.setattr(ScoreDeltaQuerySet, 'delete', delete)
+            return delete(queryset)
+
+        monkeypatch.setattr(ScoreDeltaQuerySet, 'delete', commit_late_review)
+        Title.objects.all().recompute_rating()
+        assert ScoreDelta.objects.count() == 1, (
+            'Check that recompute_rating drops only the deltas read before aggregating'
+        )
+        call_command('fold_score_deltas')
+        stored = Title.objects.get()
+        assert (stored.score_sum, stored.reviews_count, stored.rating) == (12, 2, 6)
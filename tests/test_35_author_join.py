@@ -0,0 +1,57 @@
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+from .common import create_catalogue
+
+
+def create_discussion(django_user_model, count):
+    from reviews.models import Comment, Review, Title
+
+    create_catalogue(1)
+    title = Title.objects.get()
+    authors = [
+        django_user_model.objects.create_user(username=f'writer{number}', email=f'writer{number}@yamdb.fake')
+        for number in range(count)
+    ]
+    reviews = [Review.objects.create(title=title, author=author, text='text', score=5) for author in authors]
+    for author in authors:
+        Comment.objects.create(review=reviews[0], author=author, text='text')
+    return title, reviews[0]
+
+
+def count_queries(client, url):
+    with CaptureQueriesContext(connection) as queries:
+        response = client.get(url)
+    assert response.status_code == 200
+    return len(queries), response.json()
+
+
+class Test35AuthorJoin:
+
+    @pytest.mark.django_db(transaction=True)
+    @pytest.mark.parametrize('count', [1, 5, 12])
+    def test_01_reviews_and_comments(self, client, django_user_model, count):
+        title, review = create_discussion(django_user_model, count)
+        page = min(count, 5)
+        # validators, count and the page joined with the authors
+        queries, data = count_queries(client, f'/api/v1/titles/{title.pk}/reviews/')
+        assert queries == 3, 'Check that review authors are loaded with the page'
+        assert len(data['results']) == page
+        assert {item['author'] for item in data['results']} <= {f'writer{number}' for number in range(count)}
+        queries, data = count_queries(client, f'/api/v1/titles/{title.pk}/reviews/?cursor=')
+        assert queries == 2
+        assert len(data['results']) == page
+        queries, data = count_queries(client, f'/api/v1/titles/{title.pk}/reviews/{review.pk}/comments/')
+        assert queries == 3, 'Check that comment authors are loaded with the page'
+        assert len(data['results']) == page
+
+    @pytest.mark.django_db(transaction=True)
+    def test_02_sparse_fields(self, client, django_user_model):
+        title, _ = create_discussion(django_user_model, 3)
+        queries, data = count_queries(client, f'/api/v1/titles/{title.pk}/reviews/?fields=id,score')
+        assert queries == 3, 'Check that sparse reviews do not load deferred columns per row'
+        assert data['results'][0].keys() == {'id', 'score'}
+        queries, data = count_queries(client, f'/api/v1/titles/{title.pk}/reviews/?fields=id,author')
+        assert queries == 3
+        assert data['results'][0]['author'].startswith('writer')
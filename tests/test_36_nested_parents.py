@@ -0,0 +1,64 @@
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+from .common import create_catalogue
+
+
+def create_reviews(django_user_model):
+    from reviews.models import Review, Title
+
+    create_catalogue(2)
+    first, second = Title.objects.order_by('name')
+    author = django_user_model.objects.create_user(username='writer', email='writer@yamdb.fake')
+    return (
+        Review.objects.create(title=first, author=author, text='text', score=5),
+        Review.objects.create(title=second, author=author, text='text', score=7),
+    )
+
+
+class Test36NestedParents:
+
+    @pytest.mark.django_db(transaction=True)
+    def test_01_foreign_review(self, user_client, django_user_model):
+        from reviews.models import Comment
+
+        review, foreign = create_reviews(django_user_model)
+        comment = Comment.objects.create(review=foreign, author=foreign.author, text='text')
+        url = f'/api/v1/titles/{review.title_id}/reviews/{foreign.pk}/comments/'
+        response = user_client.get(url)
+        assert response.status_code == 404, (
+            'Check that comments of a review of another title are not listed'
+        )
+        response = user_client.get(f'{url}{comment.pk}/')
+        assert response.status_code == 404
+        response = user_client.post(url, data={'text': 'text'})
+        assert response.status_code == 404, (
+            'Check that a comment is not added to a review of another title'
+        )
+        assert Comment.objects.count() == 1
+        url = f'/api/v1/titles/{foreign.title_id}/reviews/{foreign.pk}/comments/'
+        response = user_client.post(url, data={'text': 'text'})
+        assert response.status_code == 201
+        assert Comment.objects.filter(review=foreign).count() == 2
+
+    @pytest.mark.django_db(transaction=True)
+    def test_02_empty_lists(self, client, django_user_model):
+        from reviews.models import Review
+
+        review, _ = create_reviews(django_user_model)
+        url = f'/api/v1/titles/{review.title_id}/reviews/{review.pk}/comments/'
+        with CaptureQueriesContext(connection) as queries:
+            response = client.get(url)
+        assert response.status_code == 200
+        assert response.json()['results'] == []
+        # validators, count and the parent check of the empty page
+        assert len(queries) == 3
+        Review.objects.all().delete()
+        response = client.get(f'/api/v1/titles/{review.title_id}/reviews/')
+        assert response.status_code == 200
+        assert response.json()['count'] == 0
+        response = client.get('/api/v1/titles/0/reviews/')
+        assert response.status_code == 404
+        response = client.get(url)
+        assert response.status_code == 404
@@ -0,0 +1,128 @@
+import pytest
+
+from .common import auth_client, create_catalogue
+
+
+def create_review(django_user_model):
+    from reviews.models import Review, Title
+
+    create_catalogue(2)
+    title = Title.objects.order_by('name').first()
+    author = django_user_model.objects.create_user(username='writer', email='writer@yamdb.fake')
+    review = Review.objects.create(title=title, author=author, text='text', score=5)
+    Title.objects.filter(pk=title.pk).update_rating(new_score=5)
+    return review
+
+
+class Test37Counters:
+
+    @pytest.mark.django_db(transaction=True)
+    def test_01_comment_write_paths(self, user_client, django_user_model):
+        from reviews.models import Review
+
+        review = create_review(django_user_model)
+        url = f'/api/v1/titles/{review.title_id}/reviews/{review.pk}/comments/'
+        for _ in range(3):
+            response = user_client.post(url, data={'text': 'text'})
+            assert response.status_code == 201
+        review.refresh_from_db()
+        assert review.comments_count == 3, (
+            'Check that posting a comment increments the comment count of the review'
+        )
+        response = user_client.delete(f'{url}{response.json()["id"]}/')
+        assert response.status_code == 204
+        review.refresh_from_db()
+        assert review.comments_count == 2, (
+            'Check that deleting a comment decrements the comment count of the review'
+        )
+        response = user_client.get(f'/api/v1/titles/{review.title_id}/reviews/{review.pk}/')
+        assert response.json()['comments_count'] == 2
+        Review.objects.filter(pk=review.pk).update(text='old')
+        response = auth_client(review.author).patch(
+            f'/api/v1/titles/{review.title_id}/reviews/{review.pk}/', data={'text': 'new'}
+        )
+        assert response.status_code == 200
+        review.refresh_from_db()
+        assert (review.text, review.comments_count) == ('new', 2), (
+            'Check that editing a review keeps its comment count'
+        )
+
+    @pytest.mark.django_db(transaction=True)
+    def test_02_titles(self, client, django_user_model):
+        review = create_review(django_user_model)
+        response = client.get(f'/api/v1/titles/{review.title_id}/')
+        assert response.json()['reviews_count'] == 1, (
+            'Check that `/api/v1/titles/{title_id}/` returns the reviews count'
+        )
+        response = client.get('/api/v1/titles/?ordering=-reviews_count')
+        counts = [title['reviews_count'] for title in response.json()['results']]
+        assert counts == [1, 0], 'Check that titles can be sorted by the reviews count'
+
+    @pytest.mark.django_db(transaction=True)
+    def test_03_author_deletion_and_recompute(self, client, django_user_model):
+        from reviews.models import Comment, Review, Title
+
+        review = create_review(django_user_model)
+        commenter = django_user_model.objects.create_user(username='commenter', email='commenter@yamdb.fake')
+        second = Review.objects.create(title=review.title, author=commenter, text='text', score=3)
+        Title.objects.filter(pk=review.title_id).update_rating(new_score=3)
+        for author in (review.author, commenter, commenter):
+            Comment.objects.create(review=review, author=author, text='text')
+        Comment.objects.create(review=second, author=review.author, text='text')
+        Review.objects.recompute_comments_count()
+        counts = dict(Review.objects.values_list('pk', 'comments_count'))
+        assert counts == {review.pk: 3, second.pk: 1}
+        response = client.get(f'/api/v1/titles/{review.title_id}/reviews/?ordering=comments_count')
+        assert [item['id'] for item in response.json()['results']] == [second.pk, review.pk], (
+            'Check that reviews can be sorted by the comment count'
+        )
+        commenter.delete()
+        review.refresh_from_db()
+        assert review.comments_count == 1, (
+            'Check that deleting a user uncounts their comments on the reviews of others'
+        )
+
+    @pytest.mark.django_db(transaction=True)
+    def test_04_admin_writes(self, django_user_model):
+        from django.contrib import admin
+
+        from reviews.models import Comment, Review, Title
+
+        review = create_review(django_user_model)
+        comment_admin = admin.site._registry[Comment]
+        review_admin = admin.site._registry[Review]
+        for _ in range(3):
+            comment = Comment(review=review, author=review.author, text='text')
+            comment_admin.save_model(None, comment, None, False)
+        review.refresh_from_db()
+        assert review.comments_count == 3, 'Check that comments added in the admin are counted'
+        comment_admin.delete_model(None, comment)
+        comment_admin.delete_queryset(None, Comment.objects.filter(pk=Comment.objects.first().pk))
+        review.refresh_from_db()
+        assert review.comments_count == 1, 'Check that comments deleted in the admin are uncounted'
+
+        review.score = 9
+        review_admin.save_model(None, review, None, True)
+        title = Title.objects.get(pk=review.title_id)
+        assert (title.score_sum, title.reviews_count) == (9, 1)
+        review_admin.delete_queryset(None, Review.objects.filter(pk=review.pk))
+        title.refresh_from_db()
+        assert (title.score_sum, title.reviews_count, title.rating) == (0, 0, None), (
+            'Check that reviews deleted in the admin are subtracted from the rating'
+        )
+
+    @pytest.mark.django_db(transaction=True)
+    def test_05_recompute_comment_counts(self, django_user_model, capsys):
+        from django.core.management import call_command
+
+        from reviews.models import Comment, Review
+
+        review = create_review(django_user_model)
+        Comment.objects.create(review=review, author=review.author, text='text')
+        call_command('recompute_comment_counts', '--dry-run')
+        assert 'Found drift in 1 reviews' in capsys.readouterr().out
+        assert Review.objects.get().comments_count == 0
+        call_command('recompute_comment_counts')
+        assert Review.objects.get().comments_count == 1
+        call_command('recompute_comment_counts')
+        assert 'Found drift in 0 reviews' in capsys.readouterr().out